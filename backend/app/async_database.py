@@ -0,0 +1,65 @@
+"""
+Async PostgreSQL access for the API routers, backed by an asyncpg connection pool.
+
+The scripts keep using the blocking helpers in app.database; request handlers
+go through this module so a slow query never blocks the event loop.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+
+import asyncpg
+
+from app.config import settings
+
+_pool: Optional[asyncpg.Pool] = None
+_pool_lock = asyncio.Lock()
+
+
+async def init_async_pool() -> asyncpg.Pool:
+    """Return the process-wide asyncpg pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        async with _pool_lock:
+            if _pool is None:
+                _pool = await asyncpg.create_pool(
+                    host=settings.postgres_host,
+                    port=settings.postgres_port,
+                    database=settings.postgres_db,
+                    user=settings.postgres_user,
+                    password=settings.postgres_password,
+                    min_size=settings.postgres_pool_min_size,
+                    max_size=settings.postgres_pool_max_size,
+                    max_inactive_connection_lifetime=settings.postgres_pool_max_idle,
+                )
+    return _pool
+
+
+async def close_async_pool():
+    """Close the asyncpg pool, if one was created."""
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+@asynccontextmanager
+async def get_async_connection():
+    """Acquire a pooled connection for several queries in a row."""
+    pool = await init_async_pool()
+    async with pool.acquire(timeout=settings.postgres_pool_timeout) as conn:
+        yield conn
+
+
+async def fetch_all(query: str, *args) -> List[Dict[str, Any]]:
+    """Run a query and return all rows as dictionaries."""
+    async with get_async_connection() as conn:
+        rows = await conn.fetch(query, *args)
+    return [dict(row) for row in rows]
+
+
+async def fetch_one(query: str, *args) -> Optional[Dict[str, Any]]:
+    """Run a query and return the first row as a dictionary, or None."""
+    async with get_async_connection() as conn:
+        row = await conn.fetchrow(query, *args)
+    return dict(row) if row is not None else None
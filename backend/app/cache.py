@@ -0,0 +1,129 @@
+"""
+In-process response cache for the read endpoints.
+
+Entries are keyed by route and normalized query parameters, expire after
+`cache_ttl_seconds`, and are evicted least-recently-used first once either
+`cache_max_entries` or `cache_max_bytes` is exceeded. The whole cache is
+dropped whenever the dataset version changes, so a pipeline run is visible
+within `dataset_version_check_interval` seconds.
+"""
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+from app.config import settings
+from app.dataset_version import get_dataset_version
+
+_MISSING = object()
+
+
+def cache_key(route: str, **params) -> Tuple[Hashable, ...]:
+    """Build a cache key from a route name and its query parameters, ignoring unset ones."""
+    normalized = []
+    for name in sorted(params):
+        value = params[name]
+        if value is None:
+            continue
+        if isinstance(value, list):
+            value = tuple(value)
+        normalized.append((name, value))
+    return (route, tuple(normalized))
+
+
+class ResponseCache:
+    """LRU + TTL cache with a memory bound and dataset-version invalidation."""
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        self._entries = OrderedDict()  # key -> (value, size, expires_at)
+        self._bytes = 0
+        self._version = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    async def get_or_load(self, key: Tuple[Hashable, ...], loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for `key`, calling `loader` on a miss."""
+        if self.max_entries <= 0:
+            return await loader()
+
+        version = await get_dataset_version()
+        if version != self._version:
+            if self._version is not None:
+                self.invalidations += 1
+            self.clear()
+            self._version = version
+
+        value = self._get(key)
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        value = await loader()
+        # Don't store results that may have been read across a version change
+        if self._version == version:
+            self._put(key, value)
+        return value
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "dataset_version": self._version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+    def _get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        value, size, expires_at = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            return _MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    def _put(self, key, value):
+        size = len(json.dumps(value, default=str))
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (value, size, time.monotonic() + self.ttl_seconds)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+
+# Global instance
+response_cache = ResponseCache(
+    max_entries=settings.cache_max_entries,
+    max_bytes=settings.cache_max_bytes,
+    ttl_seconds=settings.cache_ttl_seconds,
+)
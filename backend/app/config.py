@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, Optional
 
 
 class Settings(BaseSettings):
@@ -10,10 +10,31 @@ class Settings(BaseSettings):
     postgres_user: str = "postgres"
     postgres_password: str = ""
     
+    # PostgreSQL connection pool
+    postgres_pool_min_size: int = 1
+    postgres_pool_max_size: int = 10
+    postgres_pool_timeout: float = 30.0  # Seconds to wait for a free connection
+    postgres_pool_max_idle: float = 300.0  # Idle connections older than this are recycled
+    postgres_pool_check_after: float = 5.0  # Ping connections idle longer than this on checkout
+    
+    # Response cache for read endpoints
+    cache_max_entries: int = 1024  # 0 disables the cache
+    cache_max_bytes: int = 64 * 1024 * 1024  # Approximate, measured as serialized JSON size
+    cache_ttl_seconds: float = 300.0
+    dataset_version_check_interval: float = 2.0  # Seconds between dataset version lookups
+    
+    # Search: at most this many matches are ranked per query, so broad terms stay fast
+    search_max_candidates: int = 1000
+    
+    # Enrichment scoring (see scripts/enrichment_scorers.py)
+    enrichment_weights: Dict[str, float] = {"rating": 1.0, "recency": 1.0, "actor_count": 1.0}
+    enrichment_scorer_versions: Dict[str, int] = {}  # Pin a component to an older version; latest otherwise
+    
     # Neo4j
     neo4j_uri: str = "bolt://localhost:7687"
     neo4j_user: str = "neo4j"
     neo4j_password: str = ""
+    neo4j_database: str = "neo4j"  # Database or alias read by the API and written by ingestion
     
     # API
     api_host: str = "localhost"
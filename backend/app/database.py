@@ -1,5 +1,13 @@
+import math
+import threading
+import time
+import uuid
+from collections import deque
+
 import psycopg2
+from psycopg2 import extensions
 from psycopg2.extras import RealDictCursor
+from psycopg2.pool import PoolError
 from contextlib import contextmanager
 from app.config import settings
 
@@ -15,18 +23,218 @@ def get_postgres_connection():
     )
 
 
+class ConnectionPool:
+    """
+    Thread-safe pool of PostgreSQL connections.
+
+    Connections are handed out most-recently-used first so that a small hot set
+    stays warm while the rest age out. On checkout a connection that has been
+    idle for longer than `check_after` seconds is pinged, and connections idle
+    for longer than `max_idle` seconds are closed down to `min_size`.
+    """
+
+    def __init__(self, min_size: int, max_size: int, timeout: float, max_idle: float, check_after: float):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Invalid pool size: expected 0 <= min_size <= max_size and max_size >= 1")
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.check_after = check_after
+
+        self._idle = deque()  # (connection, last_used) pairs, most recently used on the right
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+        for _ in range(min_size):
+            self._size += 1
+            self._idle.append((get_postgres_connection(), time.monotonic()))
+
+    def getconn(self):
+        """Check out a healthy connection, waiting up to `timeout` seconds."""
+        deadline = time.monotonic() + self.timeout
+        while True:
+            conn, last_used = self._acquire(deadline)
+            if conn is None:
+                try:
+                    return get_postgres_connection()
+                except Exception:
+                    self._release_slot()
+                    raise
+            if self._is_usable(conn, last_used):
+                return conn
+            self._discard(conn)
+
+    def putconn(self, conn):
+        """Return a connection to the pool, resetting or closing it as needed."""
+        if not conn.closed:
+            status = conn.info.transaction_status
+            if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                conn.close()
+            elif status != extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    conn.close()
+
+        if conn.closed:
+            self._release_slot()
+            return
+
+        with self._cond:
+            if self._closed:
+                self._size -= 1
+                conn.close()
+                return
+            self._idle.append((conn, time.monotonic()))
+            self._prune_idle()
+            self._cond.notify()
+
+    def close(self):
+        """Close all idle connections and refuse further checkouts."""
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                conn, _ = self._idle.popleft()
+                self._size -= 1
+                conn.close()
+            self._cond.notify_all()
+
+    def _acquire(self, deadline):
+        """Take an idle connection or reserve a slot for a new one (returns None)."""
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolError("connection pool is closed")
+                self._prune_idle()
+                if self._idle:
+                    return self._idle.pop()
+                if self._size < self.max_size:
+                    self._size += 1
+                    return None, None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolError(f"timed out after {self.timeout}s waiting for a database connection")
+                self._cond.wait(remaining)
+
+    def _prune_idle(self):
+        """Close the oldest idle connections that exceeded `max_idle`. Caller holds the lock."""
+        now = time.monotonic()
+        while self._idle and self._size > self.min_size and now - self._idle[0][1] > self.max_idle:
+            conn, _ = self._idle.popleft()
+            self._size -= 1
+            conn.close()
+
+    def _is_usable(self, conn, last_used):
+        if conn.closed:
+            return False
+        if time.monotonic() - last_used < self.check_after:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        finally:
+            self._release_slot()
+
+    def _release_slot(self):
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Return the process-wide connection pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    min_size=settings.postgres_pool_min_size,
+                    max_size=settings.postgres_pool_max_size,
+                    timeout=settings.postgres_pool_timeout,
+                    max_idle=settings.postgres_pool_max_idle,
+                    check_after=settings.postgres_pool_check_after,
+                )
+    return _pool
+
+
+def close_pool():
+    """Close the process-wide connection pool, if one was created."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
 @contextmanager
-def get_db_cursor():
-    """Context manager for database cursor."""
-    conn = get_postgres_connection()
+def get_db_cursor(name=None):
+    """
+    Context manager for database cursor.
+
+    Pass a `name` to get a server-side cursor: rows stay on the server until
+    fetched, so fetchmany() reads a large result in bounded memory.
+    """
+    pool = get_pool()
+    conn = pool.getconn()
+    cursor = None
     try:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        cursor = conn.cursor(name=name, cursor_factory=RealDictCursor)
         yield cursor
+        # A named cursor only lives as long as its transaction, so close it first
+        cursor.close()
         conn.commit()
     except Exception as e:
-        conn.rollback()
+        try:
+            conn.rollback()
+        except psycopg2.Error:
+            pass  # Connection is broken; putconn will discard it
         raise e
     finally:
-        cursor.close()
-        conn.close()
+        if cursor is not None and not cursor.closed:
+            try:
+                cursor.close()
+            except psycopg2.Error:
+                pass  # Server-side cursor already went away with its transaction
+        pool.putconn(conn)
+
+
+def stream_query(query, params=None, batch_size=1000):
+    """
+    Yield the rows of a query as lists of at most `batch_size` rows.
+
+    Reads through a named server-side cursor in one transaction, so only one
+    batch is held in memory however large the result is. The connection stays
+    checked out until the generator is exhausted or closed.
+    """
+    with get_db_cursor(name=f"stream_{uuid.uuid4().hex}") as cursor:
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+
+
+def partition_query(query, key):
+    """Restrict a query to one [lo, hi] range of `key`, bound as %(lo)s and %(hi)s."""
+    return f"SELECT * FROM ({query}) phase_rows WHERE phase_rows.{key} BETWEEN %(lo)s AND %(hi)s"
+
 
+def split_range(lo, hi, parts):
+    """Split [lo, hi] into at most `parts` contiguous, non-empty ranges."""
+    step = max(1, math.ceil((hi - lo + 1) / parts))
+    return [(start, min(start + step - 1, hi)) for start in range(lo, hi + 1, step)]
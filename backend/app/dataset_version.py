@@ -0,0 +1,37 @@
+"""
+Catalog dataset version.
+
+The pipeline scripts bump a single counter in the dataset_version table when
+they finish changing the catalog. The API treats the counter as the version of
+everything it serves: caches and validators built on it go stale as soon as
+the version moves. The value is looked up at most once per
+`dataset_version_check_interval` seconds.
+"""
+import asyncio
+import time
+
+import asyncpg
+
+from app.async_database import get_async_connection
+from app.config import settings
+
+_version = None
+_checked_at = 0.0
+_lock = asyncio.Lock()
+
+
+async def get_dataset_version() -> int:
+    """Return the current dataset version, refreshing it when the check interval has passed."""
+    global _version, _checked_at
+    if _version is not None and time.monotonic() - _checked_at < settings.dataset_version_check_interval:
+        return _version
+    async with _lock:
+        if _version is None or time.monotonic() - _checked_at >= settings.dataset_version_check_interval:
+            async with get_async_connection() as conn:
+                try:
+                    version = await conn.fetchval("SELECT version FROM dataset_version")
+                except asyncpg.UndefinedTableError:
+                    version = None  # Database predates versioning; nothing has bumped it yet
+            _version = version or 0
+            _checked_at = time.monotonic()
+    return _version
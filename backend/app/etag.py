@@ -0,0 +1,73 @@
+"""
+Conditional GET support for the read endpoints.
+
+A response's strong ETag is derived from the catalog's dataset version plus the
+route's cache key (route name, normalized query params and, for detail routes,
+the row id). The dataset version is kept in-process, so a request carrying a
+matching If-None-Match is answered with 304 before any query runs.
+
+`If-None-Match: *` means "any current representation". List and search
+responses always have one, but a detail route only has one if its row
+exists, so detail routes check the wildcard after loading the row.
+"""
+import hashlib
+from typing import Hashable, Optional, Tuple
+
+from fastapi import Response
+
+from app.dataset_version import get_dataset_version
+
+
+def make_etag(version: int, key: Tuple[Hashable, ...]) -> str:
+    """Build a strong ETag for a route key at a given dataset version."""
+    digest = hashlib.sha1(repr((version, key)).encode()).hexdigest()
+    return f'"v{version}-{digest[:16]}"'
+
+
+def is_wildcard(if_none_match: Optional[str]) -> bool:
+    return bool(if_none_match) and if_none_match.strip() == "*"
+
+
+def etag_matches(if_none_match: Optional[str], etag: str, wildcard: bool = True) -> bool:
+    """
+    Check an If-None-Match header against an ETag (weak comparison, per RFC 9110).
+
+    With wildcard=False, `*` does not match; use it when the resource may not exist.
+    """
+    if not if_none_match:
+        return False
+    if is_wildcard(if_none_match):
+        return wildcard
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+async def check_not_modified(
+    key: Tuple[Hashable, ...],
+    if_none_match: Optional[str],
+    response: Response,
+    wildcard: bool = True,
+) -> Optional[Response]:
+    """
+    Return a 304 response if the client's copy is current, else None.
+
+    When the client has to be sent a body, the ETag is set on `response` so
+    the next request can be conditional. Cache-Control: no-cache makes
+    browsers revalidate instead of reusing a copy without asking.
+
+    Detail routes pass wildcard=False and call found_not_modified once the
+    row is loaded, so `If-None-Match: *` on a missing row still gets a 404.
+    """
+    etag = make_etag(await get_dataset_version(), key)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag, wildcard):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+def found_not_modified(if_none_match: Optional[str], response: Response) -> Optional[Response]:
+    """Return a 304 for `If-None-Match: *` now that the row is known to exist, else None."""
+    if not is_wildcard(if_none_match):
+        return None
+    return Response(status_code=304, headers={name: response.headers[name] for name in ("ETag", "Cache-Control")})
@@ -1,6 +1,11 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import movies, actors, directors, chat
+from app.async_database import close_async_pool
+from app.cache import response_cache
+from app.database import close_pool
+from app.pagination import NEXT_CURSOR_HEADER
+from app.repositories.graph_sync import get_graph_sync_status
+from app.routers import movies, actors, directors, search, chat
 
 app = FastAPI(title="Movie Database API", version="1.0.0")
 
@@ -11,15 +16,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
 # Include routers
 app.include_router(movies.router, prefix="/api", tags=["movies"])
 app.include_router(actors.router, prefix="/api", tags=["actors"])
 app.include_router(directors.router, prefix="/api", tags=["directors"])
+app.include_router(search.router, prefix="/api", tags=["search"])
 app.include_router(chat.router, prefix="/api", tags=["chat"])
 
 
+@app.on_event("shutdown")
+async def shutdown():
+    await close_async_pool()
+    close_pool()
+
+
 @app.get("/")
 async def root():
     return {"message": "Movie Database API", "version": "1.0.0"}
@@ -29,3 +42,14 @@ async def root():
 async def health():
     return {"status": "healthy"}
 
+
+@app.get("/health/cache")
+async def cache_stats():
+    """Response cache counters: hits, misses, evictions and current size."""
+    return response_cache.stats()
+
+
+@app.get("/health/graph-sync")
+async def graph_sync_status():
+    """How far the Neo4j graph trails Postgres, in row versions and seconds."""
+    return await get_graph_sync_status()
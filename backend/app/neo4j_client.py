@@ -27,7 +27,7 @@ class Neo4jClient:
         Returns:
             List of result records as dictionaries
         """
-        with self.driver.session() as session:
+        with self.driver.session(database=settings.neo4j_database) as session:
             result = session.run(query, parameters or {})
             records = []
             for record in result:
@@ -0,0 +1,78 @@
+"""
+Keyset pagination helpers.
+
+List endpoints page through rows ordered by a stable sort key such as
+(release_year, id) or (name, id). The last key of a page is handed to the
+client as an opaque cursor token in the X-Next-Cursor response header; passing
+it back as `?cursor=` continues right after that row without an OFFSET scan.
+"""
+import base64
+import json
+import math
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Range of the Postgres INTEGER and REAL columns that ids, years and search
+# ranks are compared against; asyncpg rejects values outside it with a DataError
+INT4_MIN = -2**31
+INT4_MAX = 2**31 - 1
+REAL_MAX = 3.4028234663852886e38
+
+
+def _in_range(value: Any) -> bool:
+    if isinstance(value, int):
+        return INT4_MIN <= value <= INT4_MAX
+    if isinstance(value, float):
+        return math.isfinite(value) and abs(value) <= REAL_MAX
+    return True
+
+
+def encode_cursor(key: Sequence[Any]) -> str:
+    """Encode a sort key as an opaque, URL-safe token."""
+    raw = json.dumps(list(key), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: Optional[str], types: Tuple[type, ...]) -> Optional[Tuple[Any, ...]]:
+    """
+    Decode a cursor token back into a sort key.
+
+    Raises a 400 if the token is malformed, does not match the expected key
+    types, or holds a number the database columns cannot represent.
+    """
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        key = json.loads(raw)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if (
+        not isinstance(key, list)
+        or len(key) != len(types)
+        or not all(isinstance(value, t) and not isinstance(value, bool) for value, t in zip(key, types))
+        or not all(_in_range(value) for value in key)
+    ):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return tuple(key)
+
+
+def paginate(
+    response: Response,
+    rows: List[Dict[str, Any]],
+    limit: int,
+    sort_key: Callable[[Dict[str, Any]], Sequence[Any]],
+) -> List[Dict[str, Any]]:
+    """
+    Trim a `limit + 1` row fetch to one page and set the next-cursor header.
+
+    Repositories fetch one extra row; if it is present there is another page
+    and its cursor is the sort key of the last row returned.
+    """
+    items = rows[:limit]
+    if len(rows) > limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(sort_key(items[-1]))
+    return items
@@ -0,0 +1,63 @@
+"""
+Actor queries used by the actors router.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.async_database import fetch_all, get_async_connection
+
+LIST_ACTORS_SQL = """
+    SELECT a.id, a.name, (SELECT COUNT(*) FROM movie_actors ma WHERE ma.actor_id = a.id) as movie_count
+    FROM actors a
+    ORDER BY a.name, a.id
+    LIMIT $1
+"""
+
+LIST_ACTORS_AFTER_SQL = """
+    SELECT a.id, a.name, (SELECT COUNT(*) FROM movie_actors ma WHERE ma.actor_id = a.id) as movie_count
+    FROM actors a
+    WHERE (a.name, a.id) > ($1, $2)
+    ORDER BY a.name, a.id
+    LIMIT $3
+"""
+
+ACTOR_SQL = """
+    SELECT id, name FROM actors WHERE id = $1
+"""
+
+ACTOR_MOVIES_SQL = """
+    SELECT m.id, m.title, m.release_year, m.rating
+    FROM movies m
+    JOIN movie_actors ma ON m.id = ma.movie_id
+    WHERE ma.actor_id = $1
+    ORDER BY m.release_year DESC
+"""
+
+
+def actor_sort_key(actor: Dict[str, Any]) -> Tuple[str, int]:
+    """Keyset sort key for actor lists: (name, id), ascending."""
+    return (actor['name'], actor['id'])
+
+
+async def list_actors(limit: int, after: Optional[Tuple[str, int]] = None) -> List[Dict[str, Any]]:
+    """
+    List actors with their movie counts, ordered by name.
+
+    Returns up to `limit + 1` rows starting after the `after` sort key so the
+    caller can tell whether another page exists.
+    """
+    if after:
+        return await fetch_all(LIST_ACTORS_AFTER_SQL, after[0], after[1], limit + 1)
+    return await fetch_all(LIST_ACTORS_SQL, limit + 1)
+
+
+async def get_actor(actor_id: int) -> Optional[Dict[str, Any]]:
+    """Get an actor with their movies, or None if it does not exist."""
+    async with get_async_connection() as conn:
+        actor = await conn.fetchrow(ACTOR_SQL, actor_id)
+        if actor is None:
+            return None
+        
+        actor_dict = dict(actor)
+        actor_dict['movies'] = [dict(m) for m in await conn.fetch(ACTOR_MOVIES_SQL, actor_id)]
+    
+    return actor_dict
@@ -0,0 +1,62 @@
+"""
+Director queries used by the directors router.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.async_database import fetch_all, get_async_connection
+
+LIST_DIRECTORS_SQL = """
+    SELECT d.id, d.name, (SELECT COUNT(*) FROM movies m WHERE m.director_id = d.id) as movie_count
+    FROM directors d
+    ORDER BY d.name, d.id
+    LIMIT $1
+"""
+
+LIST_DIRECTORS_AFTER_SQL = """
+    SELECT d.id, d.name, (SELECT COUNT(*) FROM movies m WHERE m.director_id = d.id) as movie_count
+    FROM directors d
+    WHERE (d.name, d.id) > ($1, $2)
+    ORDER BY d.name, d.id
+    LIMIT $3
+"""
+
+DIRECTOR_SQL = """
+    SELECT id, name FROM directors WHERE id = $1
+"""
+
+DIRECTOR_MOVIES_SQL = """
+    SELECT id, title, release_year, rating, enrichment_score, popularity_tier
+    FROM movies
+    WHERE director_id = $1
+    ORDER BY release_year DESC
+"""
+
+
+def director_sort_key(director: Dict[str, Any]) -> Tuple[str, int]:
+    """Keyset sort key for director lists: (name, id), ascending."""
+    return (director['name'], director['id'])
+
+
+async def list_directors(limit: int, after: Optional[Tuple[str, int]] = None) -> List[Dict[str, Any]]:
+    """
+    List directors with their movie counts, ordered by name.
+
+    Returns up to `limit + 1` rows starting after the `after` sort key so the
+    caller can tell whether another page exists.
+    """
+    if after:
+        return await fetch_all(LIST_DIRECTORS_AFTER_SQL, after[0], after[1], limit + 1)
+    return await fetch_all(LIST_DIRECTORS_SQL, limit + 1)
+
+
+async def get_director(director_id: int) -> Optional[Dict[str, Any]]:
+    """Get a director with their movies, or None if it does not exist."""
+    async with get_async_connection() as conn:
+        director = await conn.fetchrow(DIRECTOR_SQL, director_id)
+        if director is None:
+            return None
+        
+        director_dict = dict(director)
+        director_dict['movies'] = [dict(m) for m in await conn.fetch(DIRECTOR_MOVIES_SQL, director_id)]
+    
+    return director_dict
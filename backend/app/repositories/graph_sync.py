@@ -0,0 +1,34 @@
+"""
+Graph sync status: how far the Neo4j graph trails Postgres.
+"""
+from typing import Any, Dict
+
+import asyncpg
+
+from app.async_database import fetch_one
+
+GRAPH_SYNC_STATUS_SQL = """
+    SELECT 
+        COALESCE(pg_sequence_last_value('row_version_seq'), 0) AS current_version,
+        w.row_version AS synced_version,
+        w.synced_at,
+        w.lag_seconds
+    FROM (SELECT 1) current
+    LEFT JOIN graph_sync_watermark w ON TRUE
+"""
+
+
+async def get_graph_sync_status() -> Dict[str, Any]:
+    """Latest Postgres row version, the version Neo4j was synced to, and the last measured lag."""
+    try:
+        row = await fetch_one(GRAPH_SYNC_STATUS_SQL)
+    except (asyncpg.UndefinedTableError, asyncpg.UndefinedObjectError):
+        return {"status": "change tracking is not set up; run scripts/migrate.py"}
+    synced = row["synced_version"]
+    return {
+        "current_version": row["current_version"],
+        "synced_version": synced,
+        "versions_behind": row["current_version"] - (synced or 0),
+        "synced_at": row["synced_at"],
+        "last_lag_seconds": row["lag_seconds"],
+    }
@@ -0,0 +1,165 @@
+"""
+Movie queries used by the movies router.
+
+SQL lives in module-level constants and builders so scripts/check_query_plans.py
+can EXPLAIN exactly what the API runs.
+"""
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from app.async_database import fetch_all, get_async_connection
+
+MOVIES_BY_IDS_SQL = """
+    SELECT 
+        m.id, m.title, m.release_year, m.rating, m.description, m.director_id,
+        m.duration_minutes, m.budget, m.revenue, m.language, m.country,
+        m.enrichment_score, m.popularity_tier,
+        d.name as director_name
+    FROM movies m
+    LEFT JOIN directors d ON m.director_id = d.id
+    WHERE m.id = ANY($1::int[])
+"""
+
+GENRES_BY_MOVIE_IDS_SQL = """
+    SELECT mg.movie_id, g.id, g.name
+    FROM genres g
+    JOIN movie_genres mg ON g.id = mg.genre_id
+    WHERE mg.movie_id = ANY($1::int[])
+"""
+
+ACTORS_BY_MOVIE_IDS_SQL = """
+    SELECT ma.movie_id, a.id, a.name
+    FROM actors a
+    JOIN movie_actors ma ON a.id = ma.actor_id
+    WHERE ma.movie_id = ANY($1::int[])
+"""
+
+EXPORT_COLUMNS = [
+    "id", "title", "release_year", "rating", "description",
+    "duration_minutes", "budget", "revenue", "language", "country",
+    "enrichment_score", "popularity_tier",
+    "director_name", "genres", "actors",
+]
+
+EXPORT_MOVIES_SQL = f"""
+    SELECT {", ".join(f"s.{column}" for column in EXPORT_COLUMNS)}
+    FROM movie_summary s
+    ORDER BY s.id
+"""
+
+# Rows pulled from the server-side cursor per round trip during an export
+EXPORT_BATCH_SIZE = 1000
+
+
+def movie_sort_key(movie: Dict[str, Any]) -> Tuple[int, int]:
+    """Keyset sort key for movie lists: (release year, id), both descending."""
+    return (movie['release_year'] or 0, movie['id'])
+
+
+def build_list_movies_query(
+    genre: Optional[str],
+    year: Optional[int],
+    limit: int,
+    after: Optional[Tuple[int, int]] = None,
+) -> Tuple[str, List[Any]]:
+    """Build the movie list query and its parameters."""
+    conditions = []
+    params = []
+    
+    if genre:
+        params.append(genre)
+        conditions.append(f"s.genre_names @> ARRAY[${len(params)}::text]")
+    
+    if year:
+        # sort_year equals release_year for every dated movie, and filtering on
+        # it lets the (sort_year, id) index serve both the filter and the order
+        params.append(year)
+        conditions.append(f"s.sort_year = ${len(params)}")
+    
+    if after:
+        params.extend(after)
+        conditions.append(f"(s.sort_year, s.id) < (${len(params) - 1}, ${len(params)})")
+    
+    params.append(limit + 1)
+    where = " AND ".join(conditions) or "TRUE"
+    
+    query = f"""
+        SELECT 
+            s.id, s.title, s.release_year, s.rating, s.description,
+            s.duration_minutes, s.budget, s.revenue, s.language, s.country,
+            s.enrichment_score, s.popularity_tier,
+            s.director_name, s.genres, s.actors
+        FROM movie_summary s
+        WHERE {where}
+        ORDER BY s.sort_year DESC, s.id DESC
+        LIMIT ${len(params)}
+    """
+    return query, params
+
+
+async def list_movies(
+    genre: Optional[str],
+    year: Optional[int],
+    limit: int,
+    after: Optional[Tuple[int, int]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    List movies with aggregated genres and actors, newest first.
+
+    Reads the movie_summary projection, which the pipeline scripts refresh.
+    Returns up to `limit + 1` rows starting after the `after` sort key so the
+    caller can tell whether another page exists.
+    """
+    query, params = build_list_movies_query(genre, year, limit, after)
+    return await fetch_all(query, *params)
+
+
+async def get_movies(movie_ids: List[int]) -> List[Dict[str, Any]]:
+    """
+    Get several movies with their director name, genres and actors.
+
+    Uses three set-based queries regardless of how many ids are requested.
+    Movies come back in the order of `movie_ids`; unknown ids are skipped.
+    """
+    async with get_async_connection() as conn:
+        movies = await conn.fetch(MOVIES_BY_IDS_SQL, movie_ids)
+        if not movies:
+            return []
+        
+        by_id = {}
+        for movie in movies:
+            movie_dict = dict(movie)
+            movie_dict['genres'] = []
+            movie_dict['actors'] = []
+            by_id[movie_dict['id']] = movie_dict
+        found_ids = list(by_id)
+        
+        for g in await conn.fetch(GENRES_BY_MOVIE_IDS_SQL, found_ids):
+            by_id[g['movie_id']]['genres'].append({'id': g['id'], 'name': g['name']})
+        
+        for a in await conn.fetch(ACTORS_BY_MOVIE_IDS_SQL, found_ids):
+            by_id[a['movie_id']]['actors'].append({'id': a['id'], 'name': a['name']})
+    
+    return [by_id[movie_id] for movie_id in dict.fromkeys(movie_ids) if movie_id in by_id]
+
+
+async def get_movie(movie_id: int) -> Optional[Dict[str, Any]]:
+    """Get a movie with its director name, genres and actors, or None if it does not exist."""
+    movies = await get_movies([movie_id])
+    return movies[0] if movies else None
+
+
+async def export_movies(batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Yield the whole catalog from movie_summary in id order, `batch_size` rows at a time.
+
+    Rows are read through a server-side cursor inside one read-only transaction,
+    so the export is a consistent snapshot and only one batch is held in memory.
+    """
+    async with get_async_connection() as conn:
+        async with conn.transaction(readonly=True):
+            cursor = await conn.cursor(EXPORT_MOVIES_SQL)
+            while True:
+                rows = await cursor.fetch(batch_size)
+                if not rows:
+                    break
+                yield [dict(row) for row in rows]
@@ -0,0 +1,111 @@
+"""
+Search queries used by the search router.
+
+Movies are matched with Postgres full-text search over title and description
+(the GIN-indexed movies.search_vector column) and ranked with ts_rank_cd.
+Actors and directors are matched by trigram word similarity on their names
+(GIN gin_trgm_ops indexes). All three page on (rank, id), both descending.
+
+Ranking cost grows with the number of matches, so only the newest
+`search_max_candidates` matches (highest ids) are ranked. A broad term like
+"war" therefore ranks the most recently added movies containing it rather than
+every one; narrower queries rank all of their matches. The candidates are
+picked in id order, not table order, so every page of a query ranks the same
+set and cursors stay consistent.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.async_database import fetch_all
+from app.config import settings
+
+# The inner LIMIT (the last parameter) bounds how many matches get ranked
+SEARCH_MOVIES_SQL = """
+    SELECT c.id, c.title, c.release_year, c.rating, c.description,
+           c.enrichment_score, c.popularity_tier,
+           ts_rank_cd(c.search_vector, q) AS rank
+    FROM (
+        SELECT m.id, m.title, m.release_year, m.rating, m.description,
+               m.enrichment_score, m.popularity_tier, m.search_vector
+        FROM movies m
+        WHERE m.search_vector @@ websearch_to_tsquery('english', $1)
+        ORDER BY m.id DESC
+        LIMIT $3
+    ) c, websearch_to_tsquery('english', $1) q
+    ORDER BY rank DESC, c.id DESC
+    LIMIT $2
+"""
+
+SEARCH_MOVIES_AFTER_SQL = """
+    SELECT * FROM (
+        SELECT c.id, c.title, c.release_year, c.rating, c.description,
+               c.enrichment_score, c.popularity_tier,
+               ts_rank_cd(c.search_vector, q) AS rank
+        FROM (
+            SELECT m.id, m.title, m.release_year, m.rating, m.description,
+                   m.enrichment_score, m.popularity_tier, m.search_vector
+            FROM movies m
+            WHERE m.search_vector @@ websearch_to_tsquery('english', $1)
+            ORDER BY m.id DESC
+            LIMIT $5
+        ) c, websearch_to_tsquery('english', $1) q
+    ) ranked
+    WHERE (ranked.rank, ranked.id) < ($2::real, $3)
+    ORDER BY ranked.rank DESC, ranked.id DESC
+    LIMIT $4
+"""
+
+# Trigram queries for people; {table} is a fixed table name, never user input
+SEARCH_PEOPLE_SQL = """
+    SELECT c.id, c.name, word_similarity($1, c.name) AS rank
+    FROM (SELECT p.id, p.name FROM {table} p WHERE $1 <% p.name ORDER BY p.id DESC LIMIT $3) c
+    ORDER BY rank DESC, c.id DESC
+    LIMIT $2
+"""
+
+SEARCH_PEOPLE_AFTER_SQL = """
+    SELECT * FROM (
+        SELECT c.id, c.name, word_similarity($1, c.name) AS rank
+        FROM (SELECT p.id, p.name FROM {table} p WHERE $1 <% p.name ORDER BY p.id DESC LIMIT $5) c
+    ) ranked
+    WHERE (ranked.rank, ranked.id) < ($2::real, $3)
+    ORDER BY ranked.rank DESC, ranked.id DESC
+    LIMIT $4
+"""
+
+SEARCH_TYPES = ("movies", "actors", "directors")
+
+
+def search_sort_key(row: Dict[str, Any]) -> Tuple[float, int]:
+    """Keyset sort key for search results: (rank, id), both descending."""
+    return (row['rank'], row['id'])
+
+
+def build_search_query(
+    search_type: str,
+    q: str,
+    limit: int,
+    after: Optional[Tuple[float, int]] = None,
+) -> Tuple[str, List[Any]]:
+    """Build the search query for one result type and its parameters."""
+    if search_type == "movies":
+        sql = SEARCH_MOVIES_AFTER_SQL if after else SEARCH_MOVIES_SQL
+    else:
+        sql = (SEARCH_PEOPLE_AFTER_SQL if after else SEARCH_PEOPLE_SQL).format(table=search_type)
+    params = [q, *after, limit + 1] if after else [q, limit + 1]
+    return sql, params + [settings.search_max_candidates]
+
+
+async def search(
+    search_type: str,
+    q: str,
+    limit: int,
+    after: Optional[Tuple[float, int]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Search one result type, best matches first.
+
+    Returns up to `limit + 1` rows starting after the `after` sort key so the
+    caller can tell whether another page exists.
+    """
+    sql, params = build_search_query(search_type, q, limit, after)
+    return await fetch_all(sql, *params)
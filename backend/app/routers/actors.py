@@ -1,47 +1,44 @@
-from fastapi import APIRouter, HTTPException
-from app.database import get_db_cursor
+from fastapi import APIRouter, Header, HTTPException, Path, Query, Response
+from typing import Optional
+from app.cache import cache_key, response_cache
+from app.etag import check_not_modified, found_not_modified
+from app.pagination import INT4_MAX, INT4_MIN, decode_cursor, paginate
+from app.repositories import actors as actors_repo
 
 router = APIRouter()
 
 
 @router.get("/actors")
-async def list_actors():
-    """List all actors."""
-    with get_db_cursor() as cursor:
-        cursor.execute("""
-            SELECT a.*, COUNT(ma.movie_id) as movie_count
-            FROM actors a
-            LEFT JOIN movie_actors ma ON a.id = ma.actor_id
-            GROUP BY a.id, a.name
-            ORDER BY a.name
-        """)
-        actors = cursor.fetchall()
-        return [dict(actor) for actor in actors]
+async def list_actors(
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    if_none_match: Optional[str] = Header(None)
+):
+    """List actors ordered by name, one page at a time."""
+    after = decode_cursor(cursor, (str, int))
+    key = cache_key("actors", limit=limit, after=after)
+    not_modified = await check_not_modified(key, if_none_match, response)
+    if not_modified:
+        return not_modified
+    
+    rows = await response_cache.get_or_load(key, lambda: actors_repo.list_actors(limit, after))
+    return paginate(response, rows, limit, actors_repo.actor_sort_key)
 
 
 @router.get("/actors/{actor_id}")
-async def get_actor_detail(actor_id: int):
+async def get_actor_detail(
+    response: Response,
+    actor_id: int = Path(..., ge=INT4_MIN, le=INT4_MAX),
+    if_none_match: Optional[str] = Header(None)
+):
     """Get detailed information about a specific actor."""
-    with get_db_cursor() as cursor:
-        cursor.execute("""
-            SELECT * FROM actors WHERE id = %s
-        """, (actor_id,))
-        
-        actor = cursor.fetchone()
-        if not actor:
-            raise HTTPException(status_code=404, detail="Actor not found")
-        
-        actor_dict = dict(actor)
-        
-        # Get movies
-        cursor.execute("""
-            SELECT m.id, m.title, m.release_year, m.rating
-            FROM movies m
-            JOIN movie_actors ma ON m.id = ma.movie_id
-            WHERE ma.actor_id = %s
-            ORDER BY m.release_year DESC
-        """, (actor_id,))
-        actor_dict['movies'] = [dict(m) for m in cursor.fetchall()]
-        
-        return actor_dict
-
+    key = cache_key("actors/detail", actor_id=actor_id)
+    not_modified = await check_not_modified(key, if_none_match, response, wildcard=False)
+    if not_modified:
+        return not_modified
+    
+    actor = await response_cache.get_or_load(key, lambda: actors_repo.get_actor(actor_id))
+    if not actor:
+        raise HTTPException(status_code=404, detail="Actor not found")
+    return found_not_modified(if_none_match, response) or actor
@@ -1,46 +1,44 @@
-from fastapi import APIRouter, HTTPException
-from app.database import get_db_cursor
+from fastapi import APIRouter, Header, HTTPException, Path, Query, Response
+from typing import Optional
+from app.cache import cache_key, response_cache
+from app.etag import check_not_modified, found_not_modified
+from app.pagination import INT4_MAX, INT4_MIN, decode_cursor, paginate
+from app.repositories import directors as directors_repo
 
 router = APIRouter()
 
 
 @router.get("/directors")
-async def list_directors():
-    """List all directors."""
-    with get_db_cursor() as cursor:
-        cursor.execute("""
-            SELECT d.*, COUNT(m.id) as movie_count
-            FROM directors d
-            LEFT JOIN movies m ON d.id = m.director_id
-            GROUP BY d.id, d.name
-            ORDER BY d.name
-        """)
-        directors = cursor.fetchall()
-        return [dict(director) for director in directors]
+async def list_directors(
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    if_none_match: Optional[str] = Header(None)
+):
+    """List directors ordered by name, one page at a time."""
+    after = decode_cursor(cursor, (str, int))
+    key = cache_key("directors", limit=limit, after=after)
+    not_modified = await check_not_modified(key, if_none_match, response)
+    if not_modified:
+        return not_modified
+    
+    rows = await response_cache.get_or_load(key, lambda: directors_repo.list_directors(limit, after))
+    return paginate(response, rows, limit, directors_repo.director_sort_key)
 
 
 @router.get("/directors/{director_id}")
-async def get_director_detail(director_id: int):
+async def get_director_detail(
+    response: Response,
+    director_id: int = Path(..., ge=INT4_MIN, le=INT4_MAX),
+    if_none_match: Optional[str] = Header(None)
+):
     """Get detailed information about a specific director."""
-    with get_db_cursor() as cursor:
-        cursor.execute("""
-            SELECT * FROM directors WHERE id = %s
-        """, (director_id,))
-        
-        director = cursor.fetchone()
-        if not director:
-            raise HTTPException(status_code=404, detail="Director not found")
-        
-        director_dict = dict(director)
-        
-        # Get movies
-        cursor.execute("""
-            SELECT id, title, release_year, rating, enrichment_score, popularity_tier
-            FROM movies
-            WHERE director_id = %s
-            ORDER BY release_year DESC
-        """, (director_id,))
-        director_dict['movies'] = [dict(m) for m in cursor.fetchall()]
-        
-        return director_dict
-
+    key = cache_key("directors/detail", director_id=director_id)
+    not_modified = await check_not_modified(key, if_none_match, response, wildcard=False)
+    if not_modified:
+        return not_modified
+    
+    director = await response_cache.get_or_load(key, lambda: directors_repo.get_director(director_id))
+    if not director:
+        raise HTTPException(status_code=404, detail="Director not found")
+    return found_not_modified(if_none_match, response) or director
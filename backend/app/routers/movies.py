@@ -1,93 +1,127 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import Optional, List
-from app.database import get_db_cursor
+import csv
+import io
+import json
+from decimal import Decimal
+from fastapi import APIRouter, Header, HTTPException, Path, Query, Response
+from fastapi.responses import StreamingResponse
+from typing import Any, AsyncIterator, Dict, List, Optional
+from app.cache import cache_key, response_cache
+from app.etag import check_not_modified, found_not_modified
+from app.pagination import INT4_MAX, INT4_MIN, decode_cursor, paginate
+from app.repositories import movies as movies_repo
 
 router = APIRouter()
 
+MAX_BATCH_IDS = 500
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _json_default(value: Any):
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+async def _ndjson_lines(batches: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[str]:
+    async for rows in batches:
+        yield "".join(json.dumps(row, default=_json_default) + "\n" for row in rows)
+
+
+async def _csv_lines(batches: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=movies_repo.EXPORT_COLUMNS)
+    writer.writeheader()
+    async for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
 
 @router.get("/movies")
 async def list_movies(
+    response: Response,
     genre: Optional[str] = Query(None, description="Filter by genre"),
-    year: Optional[int] = Query(None, description="Filter by release year"),
-    limit: int = Query(100, ge=1, le=1000)
+    year: Optional[int] = Query(None, ge=INT4_MIN, le=INT4_MAX, description="Filter by release year"),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    if_none_match: Optional[str] = Header(None)
 ):
-    """List all movies with optional filters."""
-    with get_db_cursor() as cursor:
-        query = """
-            SELECT 
-                m.id, m.title, m.release_year, m.rating, m.description,
-                m.duration_minutes, m.budget, m.revenue, m.language, m.country,
-                m.enrichment_score, m.popularity_tier,
-                d.name as director_name,
-                STRING_AGG(DISTINCT g.name, ', ') as genres,
-                STRING_AGG(DISTINCT a.name, ', ') as actors
-            FROM movies m
-            LEFT JOIN directors d ON m.director_id = d.id
-            LEFT JOIN movie_genres mg ON m.id = mg.movie_id
-            LEFT JOIN genres g ON mg.genre_id = g.id
-            LEFT JOIN movie_actors ma ON m.id = ma.movie_id
-            LEFT JOIN actors a ON ma.actor_id = a.id
-            WHERE 1=1
-        """
-        params = []
-        
-        if genre:
-            query += " AND EXISTS (SELECT 1 FROM movie_genres mg2 JOIN genres g2 ON mg2.genre_id = g2.id WHERE mg2.movie_id = m.id AND g2.name = %s)"
-            params.append(genre)
-        
-        if year:
-            query += " AND m.release_year = %s"
-            params.append(year)
-        
-        query += " GROUP BY m.id, m.title, m.release_year, m.rating, m.description, m.duration_minutes, m.budget, m.revenue, m.language, m.country, m.enrichment_score, m.popularity_tier, d.name"
-        query += " ORDER BY m.release_year DESC"
-        query += " LIMIT %s"
-        params.append(limit)
-        
-        cursor.execute(query, params)
-        movies = cursor.fetchall()
-        
-        # Convert to list of dicts
-        return [dict(movie) for movie in movies]
+    """List movies with optional filters, newest first, one page at a time."""
+    after = decode_cursor(cursor, (int, int))
+    key = cache_key("movies", genre=genre, year=year, limit=limit, after=after)
+    not_modified = await check_not_modified(key, if_none_match, response)
+    if not_modified:
+        return not_modified
+    
+    rows = await response_cache.get_or_load(key, lambda: movies_repo.list_movies(genre, year, limit, after))
+    return paginate(response, rows, limit, movies_repo.movie_sort_key)
+
+
+@router.get("/movies/batch")
+async def get_movie_details(
+    response: Response,
+    ids: List[str] = Query(..., description="Comma-separated movie ids, e.g. ids=1,2,3"),
+    if_none_match: Optional[str] = Header(None)
+):
+    """Get detailed information about several movies in one request."""
+    try:
+        movie_ids = [int(part) for value in ids for part in value.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+    if any(not INT4_MIN <= movie_id <= INT4_MAX for movie_id in movie_ids):
+        raise HTTPException(status_code=400, detail="ids out of range")
+    if not movie_ids:
+        raise HTTPException(status_code=400, detail="At least one id is required")
+    if len(movie_ids) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_IDS} ids per request")
+    
+    key = cache_key("movies/batch", ids=movie_ids)
+    not_modified = await check_not_modified(key, if_none_match, response)
+    if not_modified:
+        return not_modified
+    
+    return await response_cache.get_or_load(key, lambda: movies_repo.get_movies(movie_ids))
+
+
+@router.get("/movies/export")
+async def export_movies(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="ndjson (one JSON object per line) or csv")
+):
+    """
+    Stream the whole catalog with director, genres and actors.
+
+    Rows are streamed in id order as they are read, so memory use does not grow
+    with the size of the catalog.
+    """
+    batches = movies_repo.export_movies()
+    lines = _ndjson_lines(batches) if format == "ndjson" else _csv_lines(batches)
+    return StreamingResponse(
+        lines,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="movies.{format}"'},
+    )
 
 
 @router.get("/movies/{movie_id}")
-async def get_movie_detail(movie_id: int):
+async def get_movie_detail(
+    response: Response,
+    movie_id: int = Path(..., ge=INT4_MIN, le=INT4_MAX),
+    if_none_match: Optional[str] = Header(None)
+):
     """Get detailed information about a specific movie."""
-    with get_db_cursor() as cursor:
-        # Get movie details
-        cursor.execute("""
-            SELECT 
-                m.*,
-                d.name as director_name
-            FROM movies m
-            LEFT JOIN directors d ON m.director_id = d.id
-            WHERE m.id = %s
-        """, (movie_id,))
-        
-        movie = cursor.fetchone()
-        if not movie:
-            raise HTTPException(status_code=404, detail="Movie not found")
-        
-        movie_dict = dict(movie)
-        
-        # Get genres
-        cursor.execute("""
-            SELECT g.id, g.name
-            FROM genres g
-            JOIN movie_genres mg ON g.id = mg.genre_id
-            WHERE mg.movie_id = %s
-        """, (movie_id,))
-        movie_dict['genres'] = [dict(g) for g in cursor.fetchall()]
-        
-        # Get actors
-        cursor.execute("""
-            SELECT a.id, a.name
-            FROM actors a
-            JOIN movie_actors ma ON a.id = ma.actor_id
-            WHERE ma.movie_id = %s
-        """, (movie_id,))
-        movie_dict['actors'] = [dict(a) for a in cursor.fetchall()]
-        
-        return movie_dict
-
+    key = cache_key("movies/detail", movie_id=movie_id)
+    not_modified = await check_not_modified(key, if_none_match, response, wildcard=False)
+    if not_modified:
+        return not_modified
+    
+    movie = await response_cache.get_or_load(key, lambda: movies_repo.get_movie(movie_id))
+    if not movie:
+        raise HTTPException(status_code=404, detail="Movie not found")
+    return found_not_modified(if_none_match, response) or movie
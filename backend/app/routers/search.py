@@ -0,0 +1,40 @@
+import asyncpg
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from typing import Optional
+from app.cache import cache_key, response_cache
+from app.etag import check_not_modified
+from app.pagination import decode_cursor, paginate
+from app.repositories import search as search_repo
+
+router = APIRouter()
+
+
+@router.get("/search")
+async def search(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200, description="Search text, e.g. space heist or \"christopher nolan\""),
+    search_type: str = Query("movies", alias="type", pattern="^(movies|actors|directors)$", description="What to search: movies, actors or directors"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    Ranked search over the catalog.
+
+    Movies match on title and description (full-text, title weighted higher);
+    actors and directors match on name similarity, so partial names and small
+    typos still find results.
+    """
+    after = decode_cursor(cursor, (float, int))
+    q = " ".join(q.split())
+    key = cache_key("search", type=search_type, q=q, limit=limit, after=after)
+    not_modified = await check_not_modified(key, if_none_match, response)
+    if not_modified:
+        return not_modified
+    
+    try:
+        rows = await response_cache.get_or_load(key, lambda: search_repo.search(search_type, q, limit, after))
+    except (asyncpg.UndefinedColumnError, asyncpg.UndefinedFunctionError):
+        # The search migration has not run (it needs the pg_trgm extension)
+        raise HTTPException(status_code=503, detail="Search is not set up; run scripts/migrate.py")
+    return paginate(response, rows, limit, search_repo.search_sort_key)
@@ -0,0 +1,146 @@
+"""
+API latency benchmark: concurrent mixed read traffic against a running server.
+
+Fires a weighted mix of list, detail and /health requests from many concurrent
+clients and reports p50/p95/p99 latency per endpoint and overall. Run it once
+against a server built from the old code and once against the new one to get a
+before/after comparison.
+
+Usage:
+    python -m uvicorn app.main:app --port 8000
+    python scripts/benchmark_api.py --base-url http://localhost:8000 --concurrency 50 --requests 5000
+    python scripts/benchmark_api.py --output after.json
+"""
+import sys
+import json
+import math
+import random
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import requests
+
+
+# (name, weight, path builder). Ids are drawn from the ids the server returned
+# during warm-up, so detail requests hit real rows.
+def build_mix(movie_ids, actor_ids, director_ids, genres):
+    return [
+        ("GET /api/movies", 20, lambda: "/api/movies"),
+        ("GET /api/movies?genre=", 10, lambda: f"/api/movies?genre={random.choice(genres)}" if genres else "/api/movies"),
+        ("GET /api/movies/{id}", 30, lambda: f"/api/movies/{random.choice(movie_ids)}"),
+        ("GET /api/actors", 5, lambda: "/api/actors"),
+        ("GET /api/actors/{id}", 10, lambda: f"/api/actors/{random.choice(actor_ids)}"),
+        ("GET /api/directors", 5, lambda: "/api/directors"),
+        ("GET /api/directors/{id}", 10, lambda: f"/api/directors/{random.choice(director_ids)}"),
+        ("GET /health", 10, lambda: "/health"),
+    ]
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies):
+    values = sorted(latencies)
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 50) * 1000, 2) if values else None,
+        "p95_ms": round(percentile(values, 95) * 1000, 2) if values else None,
+        "p99_ms": round(percentile(values, 99) * 1000, 2) if values else None,
+        "max_ms": round(values[-1] * 1000, 2) if values else None,
+    }
+
+
+def discover_ids(base_url):
+    """Collect ids to use in detail requests."""
+    movies = requests.get(f"{base_url}/api/movies", params={"limit": 1000}, timeout=30).json()
+    actors = requests.get(f"{base_url}/api/actors", timeout=30).json()
+    directors = requests.get(f"{base_url}/api/directors", timeout=30).json()
+    genres = sorted({g.strip() for m in movies for g in (m.get("genres") or "").split(",") if g.strip()})
+    if not movies or not actors or not directors:
+        raise ValueError("The database is empty; load some movies before benchmarking.")
+    return [m["id"] for m in movies], [a["id"] for a in actors], [d["id"] for d in directors], genres
+
+
+def run_benchmark(base_url, concurrency, total_requests, seed=0):
+    random.seed(seed)
+    mix = build_mix(*discover_ids(base_url))
+    names = [name for name, _, _ in mix]
+    weights = [weight for _, weight, _ in mix]
+    plan = [random.choices(range(len(mix)), weights)[0] for _ in range(total_requests)]
+    paths = [(mix[i][0], mix[i][2]()) for i in plan]
+
+    local = threading.local()
+    latencies = {name: [] for name in names}
+    errors = {name: 0 for name in names}
+    lock = threading.Lock()
+
+    def call(item):
+        name, path = item
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        started = time.perf_counter()
+        try:
+            ok = session.get(base_url + path, timeout=60).status_code < 500
+        except requests.RequestException:
+            ok = False
+        elapsed = time.perf_counter() - started
+        with lock:
+            if ok:
+                latencies[name].append(elapsed)
+            else:
+                errors[name] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(call, paths))
+    wall = time.perf_counter() - started
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        "base_url": base_url,
+        "concurrency": concurrency,
+        "requests": total_requests,
+        "wall_seconds": round(wall, 3),
+        "throughput_rps": round(total_requests / wall, 1) if wall else None,
+        "overall": summarize(all_latencies),
+        "endpoints": {name: {**summarize(latencies[name]), "errors": errors[name]} for name in names},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark API latency under concurrent mixed requests")
+    parser.add_argument("--base-url", default="http://localhost:8000", help="Server to benchmark (default: http://localhost:8000)")
+    parser.add_argument("--concurrency", type=int, default=50, help="Concurrent clients (default: 50)")
+    parser.add_argument("--requests", type=int, default=5000, help="Total requests to send (default: 5000)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the request mix (default: 0)")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.base_url.rstrip("/"), args.concurrency, args.requests, args.seed)
+
+    print(f"{'endpoint':<28}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for name, stats in report["endpoints"].items():
+        print(f"{name:<28}{stats['count']:>7}{stats['p50_ms'] or 0:>10}{stats['p95_ms'] or 0:>10}{stats['p99_ms'] or 0:>10}{stats['errors']:>8}")
+    overall = report["overall"]
+    print(f"{'overall':<28}{overall['count']:>7}{overall['p50_ms'] or 0:>10}{overall['p95_ms'] or 0:>10}{overall['p99_ms'] or 0:>10}")
+    print(f"\n{report['throughput_rps']} req/s over {report['wall_seconds']}s")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""
+Ingestion benchmark: enrichment and Neo4j ingestion throughput on synthetic catalogs.
+
+For each scale a synthetic catalog (movies, actors, directors, genres and the
+junction tables) is generated in a scratch Postgres schema, so the real data
+is never touched. enrich_data.py and ingest_to_neo4j.py then run against it.
+
+Without --neo4j the ingester writes to a stand-in driver that records every
+Cypher statement and its row count and sleeps --latency-ms per round trip,
+so throughput can be compared between commits without a graph database.
+With --neo4j it writes to the configured Neo4j (NEO4J_DATABASE is wiped).
+
+Reports per-phase timings, statements issued and rows/sec as JSON on stdout;
+progress and a summary table go to stderr, so the output can be piped.
+
+Usage:
+    python scripts/benchmark_ingestion.py
+    python scripts/benchmark_ingestion.py --scales 1000 10000 100000 --workers 4
+    python scripts/benchmark_ingestion.py --latency-ms 0.5 --output ingestion.json
+    python scripts/benchmark_ingestion.py --scales 1000 | jq '.scales[].ingestion.seconds'
+    python scripts/benchmark_ingestion.py --neo4j --scales 10000
+"""
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from collections import Counter
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Every pooled connection of this process works inside the scratch schema.
+# Must be set before the first connection is opened.
+BENCH_SCHEMA = "ingest_bench"
+os.environ["PGOPTIONS"] = f"-c search_path={BENCH_SCHEMA}"
+
+from app.database import get_db_cursor
+from scripts.migrate import (
+    baseline, change_tracking, enrichment_components, enrichment_tracking, graph_change_feed, sync_snapshots
+)
+from scripts.enrich_data import enrich_movies
+from scripts.ingest_to_neo4j import (
+    DEFAULT_BATCH_SIZE, DEFAULT_WORKERS, INGEST_STAGES, Neo4jIngester, workers_arg
+)
+
+# Catalog shape relative to the number of movies
+ACTORS_PER_MOVIE = 0.4
+MOVIES_PER_DIRECTOR = 25
+GENRE_COUNT = 20
+CAST_SIZE = 5
+GENRES_PER_MOVIE = 2
+
+
+class _Result:
+    def __init__(self, record=None):
+        self._record = record
+
+    def consume(self):
+        return None
+
+    def single(self):
+        return self._record
+
+
+class RecordingSession:
+    """Session stand-in: records each statement and sleeps one round trip."""
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        pass
+
+    def run(self, cypher, parameters=None, **kwargs):
+        params = {**(parameters or {}), **kwargs}
+        self.driver.record(cypher, len(params.get("rows", ())))
+        # Wipe loops stop on a zero count; nothing is stored, so report nothing deleted
+        return _Result({"deleted": 0, "total": 0, "count": 0})
+
+    def execute_write(self, work, *args, **kwargs):
+        return work(self, *args, **kwargs)
+
+    execute_read = execute_write
+
+
+class RecordingDriver:
+    """Driver stand-in counting statements and rows per Cypher text."""
+
+    def __init__(self, latency_ms):
+        self.latency = latency_ms / 1000
+        self.statements = Counter()
+        self.rows = Counter()
+        self._lock = threading.Lock()
+
+    def session(self, **kwargs):
+        return RecordingSession(self)
+
+    def record(self, cypher, rows):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.statements[cypher] += 1
+            self.rows[cypher] += rows
+
+    def close(self):
+        pass
+
+
+def create_catalog(movies):
+    """(Re)create the scratch schema and fill it with a deterministic synthetic catalog."""
+    actors = max(1, int(movies * ACTORS_PER_MOVIE))
+    directors = max(1, movies // MOVIES_PER_DIRECTOR)
+    params = {
+        "movies": movies, "actors": actors, "directors": directors,
+        "genres": GENRE_COUNT, "cast": CAST_SIZE, "movie_genres": GENRES_PER_MOVIE,
+    }
+    with get_db_cursor() as cursor:
+        cursor.execute(f"DROP SCHEMA IF EXISTS {BENCH_SCHEMA} CASCADE")
+        cursor.execute(f"CREATE SCHEMA {BENCH_SCHEMA}")
+        baseline(cursor)
+        change_tracking(cursor)
+        graph_change_feed(cursor)
+        enrichment_tracking(cursor)
+        enrichment_components(cursor)
+        sync_snapshots(cursor)
+
+        cursor.execute("INSERT INTO genres (name) SELECT 'Genre ' || i FROM generate_series(1, %(genres)s) i", params)
+        cursor.execute("INSERT INTO directors (name) SELECT 'Director ' || i FROM generate_series(1, %(directors)s) i", params)
+        cursor.execute("INSERT INTO actors (name) SELECT 'Actor ' || i FROM generate_series(1, %(actors)s) i", params)
+        cursor.execute("""
+            INSERT INTO movies (title, release_year, rating, description, director_id,
+                                duration_minutes, budget, revenue, language, country)
+            SELECT 'Movie ' || i,
+                   1950 + i %% 75,
+                   1 + (i * 37 %% 90) / 10.0,
+                   'Synthetic movie number ' || i,
+                   1 + i %% %(directors)s,
+                   80 + i %% 90,
+                   1000 * i, 3000 * i, 'EN', 'US'
+            FROM generate_series(1, %(movies)s) i
+        """, params)
+        # Spread cast and genres with large primes so they look shuffled but are reproducible
+        cursor.execute("""
+            INSERT INTO movie_actors (movie_id, actor_id)
+            SELECT m.id, 1 + (m.id * 7919 + k * 104729) %% %(actors)s
+            FROM movies m, generate_series(1, %(cast)s) k
+            ON CONFLICT DO NOTHING
+        """, params)
+        cursor.execute("""
+            INSERT INTO movie_genres (movie_id, genre_id)
+            SELECT m.id, 1 + (m.id * 31 + k * 7) %% %(genres)s
+            FROM movies m, generate_series(1, %(movie_genres)s) k
+            ON CONFLICT DO NOTHING
+        """, params)
+        cursor.execute("ANALYZE")
+
+        counts = {}
+        for table in ["movies", "actors", "directors", "genres", "movie_actors", "movie_genres"]:
+            cursor.execute(f"SELECT COUNT(*) AS count FROM {table}")
+            counts[table] = cursor.fetchone()["count"]
+    return counts
+
+
+def drop_catalog():
+    with get_db_cursor() as cursor:
+        cursor.execute(f"DROP SCHEMA IF EXISTS {BENCH_SCHEMA} CASCADE")
+
+
+def quietly(fn, *args, **kwargs):
+    """Run fn with its progress output suppressed, returning (result, seconds)."""
+    started = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        result = fn(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def run_scale(movies, batch_size, workers, latency_ms, use_neo4j):
+    print(f"Generating a catalog of {movies} movies...", file=sys.stderr)
+    catalog = create_catalog(movies)
+
+    _, enrich_seconds = quietly(enrich_movies)
+
+    recorder = None if use_neo4j else RecordingDriver(latency_ms)
+    ingester = Neo4jIngester(batch_size=batch_size, workers=workers, driver=recorder)
+    try:
+        phases, ingest_seconds = quietly(ingester.ingest, clear_first=True)
+    finally:
+        ingester.close()
+
+    if recorder:
+        phase_by_cypher = {cypher: name for stage in INGEST_STAGES for name, _, _, cypher, _ in stage}
+        for cypher, count in recorder.statements.items():
+            name = phase_by_cypher.get(cypher)
+            if name:
+                phases[name]["statements"] = count
+        total_statements = sum(recorder.statements.values())
+    else:
+        total_statements = None
+
+    return {
+        "movies": movies,
+        "catalog": catalog,
+        "enrichment": {
+            "rows": catalog["movies"],
+            "seconds": round(enrich_seconds, 3),
+            "rows_per_second": round(catalog["movies"] / enrich_seconds, 1) if enrich_seconds else None,
+        },
+        "ingestion": {
+            "seconds": round(ingest_seconds, 3),
+            "statements": total_statements,
+            "phases": phases,
+        },
+    }
+
+
+def run_benchmark(scales, batch_size, workers, latency_ms, use_neo4j):
+    results = []
+    try:
+        for movies in scales:
+            results.append(run_scale(movies, batch_size, workers, latency_ms, use_neo4j))
+    finally:
+        drop_catalog()
+    return {
+        "target": "neo4j" if use_neo4j else "recording stand-in",
+        "latency_ms": None if use_neo4j else latency_ms,
+        "batch_size": batch_size,
+        "workers": workers,
+        "scales": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark enrichment and Neo4j ingestion on synthetic catalogs")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1000, 10000], help="Catalog sizes in movies (default: 1000 10000)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help=f"Ingestion batch size (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--workers", type=workers_arg, default=DEFAULT_WORKERS, help=f"Ingestion workers (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--latency-ms", type=float, default=1.0, help="Simulated round trip per statement for the stand-in (default: 1.0)")
+    parser.add_argument("--neo4j", action="store_true", help="Write to the configured Neo4j instead of the stand-in (wipes NEO4J_DATABASE)")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.scales, args.batch_size, args.workers, args.latency_ms, args.neo4j)
+
+    # Human-readable summary on stderr; stdout carries only the JSON report
+    print(f"\n{'movies':>9}{'phase':>26}{'rows':>10}{'stmts':>8}{'seconds':>10}{'rows/s':>12}", file=sys.stderr)
+    for scale in report["scales"]:
+        enrichment = scale["enrichment"]
+        print(f"{scale['movies']:>9}{'enrichment':>26}{enrichment['rows']:>10}{'':>8}{enrichment['seconds']:>10}{enrichment['rows_per_second'] or 0:>12}", file=sys.stderr)
+        for name, phase in scale["ingestion"]["phases"].items():
+            print(f"{scale['movies']:>9}{name:>26}{phase['rows']:>10}{phase.get('statements', ''):>8}{phase['seconds']:>10}{phase['rows_per_second']:>12}", file=sys.stderr)
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Query plan check: EXPLAIN every router query and fail on sequential scans of large tables.
+
+Runs the exact SQL from app/repositories with representative parameters taken
+from the database itself, walks each JSON plan, and reports any Seq Scan on a
+table whose estimated row count is at least --min-rows. Exits with status 1 if
+any query falls back to such a scan, so it can gate CI or a deploy. Queries in
+FULL_SCAN_EXPECTED read the whole table on purpose and are reported but not
+gated.
+
+Usage:
+    python scripts/check_query_plans.py
+    python scripts/check_query_plans.py --min-rows 10000
+"""
+import sys
+import json
+import asyncio
+import argparse
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.async_database import close_async_pool, get_async_connection
+from app.repositories import actors as actors_repo
+from app.repositories import directors as directors_repo
+from app.repositories import movies as movies_repo
+from app.repositories import search as search_repo
+
+# Queries that read a whole table by design. Their plans are still printed,
+# but a sequential scan does not fail the check.
+FULL_SCAN_EXPECTED = {
+    "movie export",  # Streams every movie; an index scan would only be slower
+}
+
+
+async def sample_parameters(conn):
+    """Pick ids, names and keys that exist so plans reflect real lookups."""
+    movie = await conn.fetchrow("SELECT id, title, COALESCE(release_year, 0) AS sort_year FROM movies ORDER BY id LIMIT 1 OFFSET (SELECT COUNT(*) / 2 FROM movies)")
+    actor = await conn.fetchrow("SELECT id, name FROM actors ORDER BY id LIMIT 1 OFFSET (SELECT COUNT(*) / 2 FROM actors)")
+    director = await conn.fetchrow("SELECT id, name FROM directors ORDER BY id LIMIT 1 OFFSET (SELECT COUNT(*) / 2 FROM directors)")
+    genre = await conn.fetchval("SELECT name FROM genres ORDER BY id LIMIT 1")
+    movie_ids = [row["id"] for row in await conn.fetch("SELECT id FROM movies ORDER BY id LIMIT 200")]
+    if not movie or not actor or not director or not genre:
+        raise ValueError("The database is empty; load some movies before checking query plans.")
+    return {
+        "movie_id": movie["id"],
+        "movie_key": (movie["sort_year"], movie["id"]),
+        "title": movie["title"],
+        "year": movie["sort_year"],
+        "movie_ids": movie_ids,
+        "actor_id": actor["id"],
+        "actor_key": (actor["name"], actor["id"]),
+        "director_id": director["id"],
+        "director_key": (director["name"], director["id"]),
+        "genre": genre,
+    }
+
+
+def router_queries(p):
+    """(name, sql, args) for every query the routers run."""
+    queries = []
+    for label, args in [
+        ("list movies", (None, None, 100, None)),
+        ("list movies ?genre", (p["genre"], None, 100, None)),
+        ("list movies ?year", (None, p["year"], 100, None)),
+        ("list movies ?genre&year", (p["genre"], p["year"], 100, None)),
+        ("list movies ?cursor", (None, None, 100, p["movie_key"])),
+    ]:
+        sql, params = movies_repo.build_list_movies_query(*args)
+        queries.append((label, sql, params))
+    queries += [
+        ("movie detail", movies_repo.MOVIES_BY_IDS_SQL, [[p["movie_id"]]]),
+        ("movie batch", movies_repo.MOVIES_BY_IDS_SQL, [p["movie_ids"]]),
+        ("movie batch genres", movies_repo.GENRES_BY_MOVIE_IDS_SQL, [p["movie_ids"]]),
+        ("movie batch actors", movies_repo.ACTORS_BY_MOVIE_IDS_SQL, [p["movie_ids"]]),
+        ("movie export", movies_repo.EXPORT_MOVIES_SQL, []),
+        ("list actors", actors_repo.LIST_ACTORS_SQL, [101]),
+        ("list actors ?cursor", actors_repo.LIST_ACTORS_AFTER_SQL, [*p["actor_key"], 101]),
+        ("actor detail", actors_repo.ACTOR_SQL, [p["actor_id"]]),
+        ("actor movies", actors_repo.ACTOR_MOVIES_SQL, [p["actor_id"]]),
+        ("list directors", directors_repo.LIST_DIRECTORS_SQL, [101]),
+        ("list directors ?cursor", directors_repo.LIST_DIRECTORS_AFTER_SQL, [*p["director_key"], 101]),
+        ("director detail", directors_repo.DIRECTOR_SQL, [p["director_id"]]),
+        ("director movies", directors_repo.DIRECTOR_MOVIES_SQL, [p["director_id"]]),
+    ]
+    for search_type, q in [("movies", p["title"]), ("actors", p["actor_key"][0]), ("directors", p["director_key"][0])]:
+        sql, params = search_repo.build_search_query(search_type, q, 20)
+        queries.append((f"search {search_type}", sql, params))
+    return queries
+
+
+def seq_scans(plan):
+    """Yield the relation name of every Seq Scan node in a JSON plan tree."""
+    if plan.get("Node Type") == "Seq Scan":
+        yield plan.get("Relation Name")
+    for child in plan.get("Plans", []):
+        yield from seq_scans(child)
+
+
+async def check(min_rows):
+    async with get_async_connection() as conn:
+        large_tables = {
+            row["relname"]: int(row["reltuples"])
+            for row in await conn.fetch("""
+                SELECT c.relname, c.reltuples
+                FROM pg_class c
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE n.nspname = current_schema() AND c.relkind IN ('r', 'm') AND c.reltuples >= $1
+            """, min_rows)
+        }
+        params = await sample_parameters(conn)
+
+        failures = []
+        for name, sql, args in router_queries(params):
+            raw = await conn.fetchval("EXPLAIN (FORMAT JSON) " + sql, *args)
+            plan = json.loads(raw)[0]["Plan"]
+            scanned = sorted({table for table in seq_scans(plan) if table in large_tables})
+            if scanned and name in FULL_SCAN_EXPECTED:
+                print(f"  ~ {name:<28} Seq Scan on {', '.join(scanned)} (expected, full-table read)")
+            elif scanned:
+                failures.append(name)
+                print(f"  ✗ {name:<28} Seq Scan on {', '.join(f'{t} (~{large_tables[t]} rows)' for t in scanned)}")
+            else:
+                print(f"  ✓ {name:<28} cost {plan['Total Cost']:.1f}")
+    return failures
+
+
+async def run(min_rows):
+    try:
+        return await check(min_rows)
+    finally:
+        await close_async_pool()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail if any router query sequentially scans a large table")
+    parser.add_argument(
+        "--min-rows",
+        type=int,
+        default=100000,
+        help="Tables with at least this many estimated rows count as large (default: 100000)"
+    )
+    args = parser.parse_args()
+
+    print(f"Checking router query plans (large table = {args.min_rows}+ rows)...")
+    failures = asyncio.run(run(args.min_rows))
+    if failures:
+        print(f"\n❌ {len(failures)} query plan(s) fall back to a sequential scan on a large table")
+        sys.exit(1)
+    print("\n✅ No sequential scans on large tables")
+
+
+if __name__ == "__main__":
+    main()
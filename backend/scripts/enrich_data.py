@@ -5,39 +5,64 @@ This script computes additional metadata for movies:
 1. Enrichment Score: Based on rating, release year recency, and number of actors
 2. Popularity Tier: Categorizes movies as "High", "Medium", or "Low" based on enrichment score
 
-The enriched data is written back to the movies table.
+The score is a weighted sum of versioned components from
+scripts/enrichment_scorers.py (weights come from ENRICHMENT_WEIGHTS). Each
+movie stores its component scores and the scorer version next to the score.
+After a component or weight change, --incremental recomputes only what the
+change affects.
+
+The enriched data is written back to the movies table. Scores are computed
+for a whole batch at once and written with a single UPDATE ... FROM (VALUES)
+per batch; rows whose score and tier are unchanged are not touched.
+
+With --incremental only dirty movies are rescored: new movies, movies whose
+rating or release year changed, and movies whose cast changed (see the
+enrichment_tracking migration). When the year has rolled over since the last
+run, every movie whose score depends on the year (as declared by the active
+scorers) is marked dirty first.
+Each run is recorded in enrichment_runs.
+
+With --workers N the movies are split into id ranges and scored by a pool of
+N processes, each streaming its ranges and writing them over its own
+connection. A range that fails is retried on its own. Workers use the year
+and scorer settings read by the parent, so results match a serial run.
+
+Usage:
+    python scripts/enrich_data.py                # rescore every movie
+    python scripts/enrich_data.py --incremental  # rescore only what changed
+    python scripts/enrich_data.py --workers 8    # score id ranges in 8 processes
 """
 import sys
 import os
+import time
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.database import get_db_cursor
+from psycopg2.extras import Json, execute_values
+
+from app.database import close_pool, get_db_cursor, partition_query, split_range, stream_query
+from scripts.enrichment_scorers import ScoringPipeline
+from scripts.setup_db import bump_dataset_version, refresh_movie_summary
 from datetime import datetime
 
 
-def calculate_enrichment_score(rating, release_year, actor_count):
+def calculate_enrichment_score(rating, release_year, actor_count, current_year=None):
     """
-    Calculate enrichment score based on:
+    Calculate one movie's enrichment score with the configured scorers.
+
+    By default the score is the sum of:
     - Rating (0-10 scale, normalized to 0-50 points)
     - Release year recency (newer movies get bonus, max 30 points)
     - Actor count (more actors = more complex, max 20 points)
+
+    See scripts/enrichment_scorers.py for the components and their weights.
     """
-    current_year = datetime.now().year
-    
-    # Rating component (0-50 points)
-    rating_score = (rating or 0) * 5
-    
-    # Recency component (0-30 points)
-    # Movies from last 10 years get full points, older movies get less
-    years_ago = current_year - release_year if release_year else 50
-    recency_score = max(0, 30 - (years_ago / 10) * 3)
-    
-    # Actor count component (0-20 points)
-    # More actors = more complex/enriched
-    actor_score = min(20, actor_count * 2)
-    
-    total_score = rating_score + recency_score + actor_score
-    return round(total_score, 2)
+    pipeline = ScoringPipeline.from_settings()
+    row = {"rating": rating, "release_year": release_year, "actor_count": actor_count}
+    components = pipeline.components_for([row], current_year or datetime.now().year)[0]
+    return pipeline.total(components)
 
 
 def determine_popularity_tier(score):
@@ -50,49 +75,300 @@ def determine_popularity_tier(score):
         return "Low"
 
 
-def enrich_movies():
-    """Main enrichment function."""
-    print("Starting enrichment process...")
-    
+# Movies read per server-side cursor fetch and written per transaction
+BATCH_SIZE = 10000
+
+DEFAULT_WORKERS = 1
+# Id ranges per worker: smaller ranges balance uneven ones and make retries cheaper
+PARTITIONS_PER_WORKER = 4
+MAX_PARTITION_RETRIES = 3
+RETRY_BACKOFF_SECONDS = 1.0
+
+MOVIE_STATS_SQL = """
+    SELECT 
+        m.id,
+        m.rating,
+        m.release_year,
+        m.row_version,
+        m.enrichment_dirty,
+        m.enrichment_components,
+        COUNT(ma.actor_id) as actor_count
+    FROM movies m
+    LEFT JOIN movie_actors ma ON m.id = ma.movie_id
+    GROUP BY m.id
+"""
+
+# Dirty movies are few, so count each one's cast through the movie_actors
+# primary key instead of aggregating the whole table
+DIRTY_MOVIE_STATS_SQL = """
+    SELECT 
+        m.id,
+        m.rating,
+        m.release_year,
+        m.row_version,
+        m.enrichment_dirty,
+        m.enrichment_components,
+        (SELECT COUNT(*) FROM movie_actors ma WHERE ma.movie_id = m.id) as actor_count
+    FROM movies m
+    WHERE m.enrichment_dirty
+"""
+
+# After a scorer change: dirty movies plus every movie scored by another version
+STALE_MOVIE_STATS_SQL = """
+    SELECT 
+        m.id,
+        m.rating,
+        m.release_year,
+        m.row_version,
+        m.enrichment_dirty,
+        m.enrichment_components,
+        (SELECT COUNT(*) FROM movie_actors ma WHERE ma.movie_id = m.id) as actor_count
+    FROM movies m
+    WHERE m.enrichment_dirty OR m.enrichment_scorer_version IS DISTINCT FROM %(scorer_version)s
+"""
+
+# Only rows whose values actually change are updated, so a re-run does not
+# bump row_version (and trigger a graph sync) for every movie. A row edited
+# since it was read has a new row_version and stays dirty for the next run.
+UPDATE_ENRICHMENT_SQL = """
+    UPDATE movies m
+    SET enrichment_score = v.enrichment_score,
+        popularity_tier = v.popularity_tier,
+        enrichment_components = v.enrichment_components,
+        enrichment_scorer_version = v.enrichment_scorer_version,
+        enrichment_dirty = FALSE
+    FROM (VALUES %s) AS v(id, row_version, enrichment_score, popularity_tier,
+                          enrichment_components, enrichment_scorer_version)
+    WHERE m.id = v.id
+      AND m.row_version = v.row_version
+      AND (m.enrichment_dirty
+           OR (m.enrichment_score, m.popularity_tier, m.enrichment_scorer_version)
+              IS DISTINCT FROM (v.enrichment_score, v.popularity_tier, v.enrichment_scorer_version))
+"""
+UPDATE_ENRICHMENT_TEMPLATE = "(%s, %s::bigint, %s::numeric, %s::varchar, %s::jsonb, %s::varchar)"
+
+# {condition} comes from the active scorers (ScoringPipeline.year_rollover_condition)
+MARK_YEAR_ROLLOVER_SQL = """
+    UPDATE movies SET enrichment_dirty = TRUE
+    WHERE NOT enrichment_dirty AND ({condition})
+"""
+
+
+def score_batch(movies, pipeline, current_year, full=True):
+    """
+    Compute (movie_id, row_version, score, tier, components, scorer version) for a batch of movie rows.
+
+    A full rescore recomputes every component. Otherwise only dirty movies
+    are recomputed from scratch; for the rest, only components missing from
+    their stored enrichment_components are computed.
+    """
+    rows = [
+        {
+            "rating": float(movie['rating']) if movie['rating'] else None,
+            "release_year": movie['release_year'],
+            "actor_count": movie['actor_count'] or 0,
+        }
+        for movie in movies
+    ]
+    recompute = [True] * len(movies) if full else [movie['enrichment_dirty'] for movie in movies]
+    stored = [movie['enrichment_components'] for movie in movies]
+    batch = []
+    for movie, components in zip(movies, pipeline.components_for(rows, current_year, stored, recompute)):
+        enrichment_score = pipeline.total(components)
+        batch.append((
+            movie['id'], movie['row_version'], enrichment_score, determine_popularity_tier(enrichment_score),
+            Json(components), pipeline.version,
+        ))
+    return batch
+
+
+def enriched_batches(movie_batches, pipeline, current_year, full=True):
+    """Turn batches of movie rows into batches ready for write_batch()."""
+    for movies in movie_batches:
+        yield score_batch(movies, pipeline, current_year, full)
+
+
+def write_batch(cursor, batch):
+    """Write one batch from score_batch() and return how many rows changed."""
+    execute_values(cursor, UPDATE_ENRICHMENT_SQL, batch, template=UPDATE_ENRICHMENT_TEMPLATE, page_size=len(batch))
+    return cursor.rowcount
+
+
+def start_run(mode, current_year, scorer_version):
+    """
+    Record the start of a run and return (run_id, last finished run).
+
+    The last run is a dict with scoring_year and scorer_version, or None if
+    no run has finished yet.
+    """
     with get_db_cursor() as cursor:
-        # Get all movies with their ratings, years, and actor counts
         cursor.execute("""
-            SELECT 
-                m.id,
-                m.rating,
-                m.release_year,
-                COUNT(ma.actor_id) as actor_count
-            FROM movies m
-            LEFT JOIN movie_actors ma ON m.id = ma.movie_id
-            GROUP BY m.id, m.rating, m.release_year
+            SELECT scoring_year, scorer_version FROM enrichment_runs
+            WHERE finished_at IS NOT NULL
+            ORDER BY finished_at DESC LIMIT 1
         """)
-        
-        movies = cursor.fetchall()
-        print(f"Processing {len(movies)} movies...")
-        
-        for movie in movies:
-            movie_id = movie['id']
-            rating = float(movie['rating']) if movie['rating'] else None
-            release_year = movie['release_year']
-            actor_count = movie['actor_count'] or 0
-            
-            # Calculate enrichment metrics
-            enrichment_score = calculate_enrichment_score(rating, release_year, actor_count)
-            popularity_tier = determine_popularity_tier(enrichment_score)
-            
-            # Update movie record
-            cursor.execute("""
-                UPDATE movies
-                SET enrichment_score = %s,
-                    popularity_tier = %s
-                WHERE id = %s
-            """, (enrichment_score, popularity_tier, movie_id))
-            
-            print(f"  Enriched: Movie ID {movie_id} - Score: {enrichment_score}, Tier: {popularity_tier}")
-        
-        print("Enrichment completed successfully!")
+        last = cursor.fetchone()
+        cursor.execute(
+            "INSERT INTO enrichment_runs (mode, scoring_year, scorer_version) VALUES (%s, %s, %s) RETURNING id",
+            (mode, current_year, scorer_version)
+        )
+        return cursor.fetchone()["id"], last
 
 
-if __name__ == "__main__":
-    enrich_movies()
+def finish_run(run_id, scored, updated):
+    with get_db_cursor() as cursor:
+        cursor.execute("""
+            UPDATE enrichment_runs
+            SET finished_at = now(), movies_scored = %s, movies_updated = %s
+            WHERE id = %s
+        """, (scored, updated, run_id))
+
+
+def mark_year_rollover(pipeline, last_year):
+    """Mark every movie whose score the pipeline computed differently in `last_year` as dirty."""
+    condition = pipeline.year_rollover_condition(last_year)
+    if condition is None:
+        return 0
+    sql, params = condition
+    with get_db_cursor() as cursor:
+        cursor.execute(MARK_YEAR_ROLLOVER_SQL.format(condition=sql), params)
+        return cursor.rowcount
+
 
+def enrich_partition(query, params, bounds, weights, versions, current_year, full, progress=False):
+    """
+    Score and write the movies of one id range ([lo, hi], or None for all).
+
+    Runs in a worker process, so it takes everything the parent decided
+    (scorer settings, year) as arguments. Returns (processed, updated).
+    """
+    pipeline = ScoringPipeline(weights, versions)
+    if bounds is not None:
+        query = partition_query(query, "id")
+        params = {**(params or {}), "lo": bounds[0], "hi": bounds[1]}
+
+    processed = 0
+    updated = 0
+    batches = stream_query(query, params, batch_size=BATCH_SIZE)
+    for batch in enriched_batches(batches, pipeline, current_year, full):
+        with get_db_cursor() as cursor:
+            updated += write_batch(cursor, batch)
+        processed += len(batch)
+        if progress:
+            print(f"  Enriched {processed} movies ({updated} changed)")
+    return processed, updated
+
+
+def _enrich_partition_in_worker(*args):
+    try:
+        return enrich_partition(*args)
+    finally:
+        close_pool()
+
+
+def movie_partitions(query, params, workers):
+    """Id ranges splitting the movies selected by `query` into chunks for the workers."""
+    with get_db_cursor() as cursor:
+        cursor.execute(f"SELECT MIN(q.id) AS lo, MAX(q.id) AS hi FROM ({query}) q", params)
+        bounds = cursor.fetchone()
+    if bounds["lo"] is None:
+        return []
+    return split_range(bounds["lo"], bounds["hi"], workers * PARTITIONS_PER_WORKER)
+
+
+def enrich_in_parallel(query, params, workers, pipeline_args):
+    """
+    Score every partition on a pool of `workers` processes.
+
+    Partitions that fail (including those lost when a worker process dies)
+    are retried in a fresh pool, up to MAX_PARTITION_RETRIES times each.
+    Writes are guarded by row_version and skip unchanged rows, so repeating
+    a partially written range is safe. Returns (processed, updated).
+    """
+    partitions = movie_partitions(query, params, workers)
+    print(f"  Scoring {len(partitions)} id ranges on {workers} worker processes")
+    attempts = {bounds: 0 for bounds in partitions}
+    processed = 0
+    updated = 0
+    # spawn: workers must not inherit the parent's pooled connections
+    context = multiprocessing.get_context("spawn")
+    while partitions:
+        failed = []
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            futures = {
+                executor.submit(_enrich_partition_in_worker, query, params, bounds, *pipeline_args): bounds
+                for bounds in partitions
+            }
+            for future in as_completed(futures):
+                lo, hi = bounds = futures[future]
+                try:
+                    rows, changed = future.result()
+                except Exception as e:
+                    attempts[bounds] += 1
+                    if attempts[bounds] > MAX_PARTITION_RETRIES:
+                        raise RuntimeError(f"Id range {lo}-{hi} failed {attempts[bounds]} times") from e
+                    print(f"  ✗ Id range {lo}-{hi} failed ({e}); will retry")
+                    failed.append(bounds)
+                    continue
+                processed += rows
+                updated += changed
+                print(f"  ✓ Id range {lo}-{hi}: {rows} movies ({changed} changed)")
+        if failed:
+            time.sleep(RETRY_BACKOFF_SECONDS * max(attempts[bounds] for bounds in failed))
+        partitions = failed
+    return processed, updated
+
+
+def enrich_movies(incremental=False, workers=DEFAULT_WORKERS):
+    """Main enrichment function."""
+    print("Starting enrichment process...")
+    pipeline = ScoringPipeline.from_settings()
+    current_year = datetime.now().year
+    print(f"  Scorer: {pipeline.version}")
+    run_id, last_run = start_run("incremental" if incremental else "full", current_year, pipeline.version)
+
+    query, params = MOVIE_STATS_SQL, None
+    if incremental:
+        query = DIRTY_MOVIE_STATS_SQL
+        if last_run and last_run["scoring_year"] != current_year:
+            marked = mark_year_rollover(pipeline, last_run["scoring_year"])
+            print(f"  Year rolled over from {last_run['scoring_year']} to {current_year}: {marked} movies need rescoring")
+        if not last_run or last_run["scorer_version"] != pipeline.version:
+            # Scorer or weights changed: also pick up movies scored by another version
+            query, params = STALE_MOVIE_STATS_SQL, {"scorer_version": pipeline.version}
+    
+    # Movies are streamed from a server-side cursor and each batch is written
+    # in its own transaction before the next one is fetched, so memory stays
+    # flat however large the catalog is. Re-running recomputes every score, so
+    # an interrupted run is safe to repeat.
+    pipeline_args = (pipeline.weights, pipeline.versions, current_year, not incremental)
+    if workers > 1:
+        processed, updated = enrich_in_parallel(query, params, workers, pipeline_args)
+    else:
+        processed, updated = enrich_partition(query, params, None, *pipeline_args, progress=True)
+    
+    finish_run(run_id, processed, updated)
+    print(f"Enrichment completed successfully! ({processed} movies, {updated} updated)")
+    
+    if updated:
+        refresh_movie_summary()
+        bump_dataset_version()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compute enrichment scores and popularity tiers")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only rescore movies that changed since the last run"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Worker processes, each scoring its own id ranges over its own connection (default: {DEFAULT_WORKERS})"
+    )
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    enrich_movies(incremental=args.incremental, workers=args.workers)
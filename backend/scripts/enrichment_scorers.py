@@ -0,0 +1,189 @@
+"""
+Enrichment scorer registry.
+
+An enrichment score is a weighted sum of components. Each component is a
+versioned scorer that takes a batch of movies as columns (one list per input
+field) and returns one score per movie. The components and weights in use
+come from ENRICHMENT_WEIGHTS (and ENRICHMENT_SCORER_VERSIONS to pin an older
+version); see app/config.py.
+
+Component scores are stored per movie in enrichment_components under
+"name@version". When a component changes version, only that key is missing
+and only that component is recomputed. When only a weight changes, the total
+is recomputed from the stored components.
+
+To add or change a component, register a new class (bump `version` when its
+output changes):
+
+    @register
+    class RuntimeScorer(Scorer):
+        name = "runtime"
+        version = 1
+        inputs = ("duration_minutes",)
+
+        def score(self, columns, current_year):
+            ...
+
+A scorer whose output depends on `current_year` must set `uses_year = True`,
+so its movies are rescored when the year rolls over. It can also override
+`year_rollover_condition` to limit that to the movies it affects.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+
+# (name, version) -> scorer class
+SCORERS = {}
+
+
+def register(cls):
+    """Class decorator adding a scorer to the registry."""
+    key = (cls.name, cls.version)
+    if key in SCORERS:
+        raise ValueError(f"Scorer {cls.name}@{cls.version} is already registered")
+    SCORERS[key] = cls
+    return cls
+
+
+class Scorer:
+    name = None
+    version = None
+    inputs = ()  # Columns read from MOVIE_STATS_SQL rows
+    uses_year = False  # True if score() depends on current_year
+
+    @property
+    def key(self):
+        return f"{self.name}@{self.version}"
+
+    def score(self, columns, current_year):
+        """Return one score per row for the given input columns."""
+        raise NotImplementedError
+
+    def year_rollover_condition(self, last_year):
+        """
+        SQL condition on movies (and its params) selecting the rows whose
+        score changes when the year moves on from `last_year`.
+
+        Only called when `uses_year` is set. The default, None, means every
+        movie; override it to narrow the rescoring.
+        """
+        return None
+
+
+@register
+class RatingScorer(Scorer):
+    """Rating (0-10 scale, normalized to 0-50 points)."""
+    name = "rating"
+    version = 1
+    inputs = ("rating",)
+
+    def score(self, columns, current_year):
+        return [(rating or 0) * 5 for rating in columns["rating"]]
+
+
+@register
+class RecencyScorer(Scorer):
+    """Release year recency: movies lose 3 of 30 points per decade. Unknown years count as 50 years old."""
+    name = "recency"
+    version = 1
+    inputs = ("release_year",)
+    uses_year = True
+
+    def score(self, columns, current_year):
+        return [
+            max(0, 30 - ((current_year - year if year else 50) / 10) * 3)
+            for year in columns["release_year"]
+        ]
+
+    def year_rollover_condition(self, last_year):
+        # Movies 100+ years old in `last_year` already score 0 and stay there;
+        # NULL years use a fixed age (and never match the comparison)
+        return "release_year > %s - 100", [last_year]
+
+
+@register
+class ActorCountScorer(Scorer):
+    """Actor count: more actors = more complex, 2 points each up to 20."""
+    name = "actor_count"
+    version = 1
+    inputs = ("actor_count",)
+
+    def score(self, columns, current_year):
+        return [min(20, count * 2) for count in columns["actor_count"]]
+
+
+def latest_version(name):
+    versions = [version for scorer_name, version in SCORERS if scorer_name == name]
+    if not versions:
+        raise ValueError(f"Unknown enrichment scorer: {name}")
+    return max(versions)
+
+
+class ScoringPipeline:
+    """Weighted sum of scorers, applied to batches of movie rows."""
+
+    def __init__(self, weights, versions=None):
+        versions = versions or {}
+        self.components = []
+        for name, weight in weights.items():
+            version = versions.get(name, latest_version(name))
+            if (name, version) not in SCORERS:
+                raise ValueError(f"Unknown enrichment scorer version: {name}@{version}")
+            self.components.append((SCORERS[(name, version)](), weight))
+        self.weights = dict(weights)
+        # Resolved versions, so worker processes build exactly the same pipeline
+        self.versions = {scorer.name: scorer.version for scorer, _ in self.components}
+        # Identifies components and weights; stored next to every score
+        self.version = ",".join(f"{scorer.key}*{weight:g}" for scorer, weight in self.components)
+
+    @classmethod
+    def from_settings(cls):
+        return cls(settings.enrichment_weights, settings.enrichment_scorer_versions)
+
+    @property
+    def inputs(self):
+        return sorted({column for scorer, _ in self.components for column in scorer.inputs})
+
+    def components_for(self, rows, current_year, stored=None, recompute=None):
+        """
+        Component scores for each row, as {"name@version": score} dicts.
+
+        `stored` holds each row's previously stored components. A component
+        is only recomputed for rows where it is missing from `stored`, or
+        where `recompute` is true for that row.
+        """
+        stored = stored or [None] * len(rows)
+        recompute = recompute or [True] * len(rows)
+        result = [dict(previous or {}) if not redo else {} for previous, redo in zip(stored, recompute)]
+        for scorer, _ in self.components:
+            todo = [i for i, components in enumerate(result) if scorer.key not in components]
+            if not todo:
+                continue
+            columns = {column: [rows[i][column] for i in todo] for column in scorer.inputs}
+            for i, value in zip(todo, scorer.score(columns, current_year)):
+                result[i][scorer.key] = value
+        # Drop components (or versions) no longer in use
+        keys = [scorer.key for scorer, _ in self.components]
+        return [{key: components[key] for key in keys} for components in result]
+
+    def year_rollover_condition(self, last_year):
+        """
+        SQL condition (and params) on movies selecting the rows to rescore
+        after the year moves on from `last_year`, or None if no component
+        depends on the year.
+        """
+        conditions = [scorer.year_rollover_condition(last_year) for scorer, _ in self.components if scorer.uses_year]
+        if not conditions:
+            return None
+        if any(condition is None for condition in conditions):
+            return "TRUE", []
+        return (
+            " OR ".join(f"({sql})" for sql, _ in conditions),
+            [param for _, params in conditions for param in params],
+        )
+
+    def total(self, components):
+        """Weighted sum of one row's components, rounded like enrichment_score."""
+        return round(sum(weight * components[scorer.key] for scorer, weight in self.components), 2)
@@ -5,22 +5,47 @@ Requirements:
 1. Get a free API key from https://www.themoviedb.org/settings/api
 2. Add TMDB_API_KEY to your .env file
 
+Movies are fetched on a pool of threads sharing one keep-alive HTTP session,
+limited by a token bucket. Rate-limited (429) and failed requests are retried
+with backoff, honoring Retry-After.
+
 Usage:
     python scripts/fetch_movies_from_tmdb.py --count 50
+    python scripts/fetch_movies_from_tmdb.py --count 10000 --concurrency 16 --rate 40
+    python scripts/fetch_movies_from_tmdb.py --count 100 --base-url http://localhost:8765/3  # see mock_tmdb_server.py
 """
 
 import sys
 import os
+import math
+import time
+import random
 import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from itertools import repeat
 from pathlib import Path
 
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent))
 
 import requests
-from datetime import date
+from requests.adapters import HTTPAdapter
+from datetime import date, datetime, timezone
 from app.config import settings
 from app.database import get_db_cursor
+from scripts.setup_db import bump_dataset_version, create_schema, refresh_movie_summary
+
+DEFAULT_BASE_URL = "https://api.themoviedb.org/3"
+DEFAULT_CONCURRENCY = 8
+DEFAULT_RATE = 40.0  # Requests per second, under TMDB's documented ~50/s
+DEFAULT_BURST = 20
+DEFAULT_MAX_RETRIES = 5
+RETRY_BACKOFF_SECONDS = 0.5
+MAX_RETRY_AFTER_SECONDS = 60.0
+DISCOVER_PAGE_SIZE = 20
+MAX_DISCOVER_PAGES = 500  # TMDB refuses discover pages beyond this
 
 
 def get_tmdb_api_key():
@@ -63,65 +88,198 @@ def is_movie_complete(tmdb_movie):
 
 
 
-def fetch_movies(api_key: str, count: int = 50, min_vote_count: int = 1000):
-    """Fetch popular movies from TMDB."""
-    base_url = "https://api.themoviedb.org/3"
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` requests per second with bursts of up to `capacity`.
+
+    pause() blocks every caller until a deadline, so a 429 seen by one
+    thread slows down all of them.
+    """
+
+    def __init__(self, rate, capacity):
+        if rate <= 0 or capacity < 1:
+            raise ValueError("rate must be positive and capacity at least 1")
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now >= self.paused_until:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+                else:
+                    wait = self.paused_until - now
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0
+            self.updated = self.paused_until
+
+
+def retry_after_seconds(response):
+    """Seconds requested by a Retry-After header (delta or HTTP date), or None."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class TMDBClient:
+    """
+    TMDB API client shared by the fetcher threads.
+
+    Requests go through one requests.Session, whose keep-alive connection
+    pool is sized to the number of threads. A shared token bucket limits
+    them. 429 and 5xx responses, timeouts and connection errors are retried
+    with exponential backoff. A 429 waits for at least its Retry-After.
+    """
+
+    def __init__(self, api_key, base_url=DEFAULT_BASE_URL, concurrency=DEFAULT_CONCURRENCY,
+                 rate=DEFAULT_RATE, burst=DEFAULT_BURST, max_retries=DEFAULT_MAX_RETRIES, timeout=10):
+        self.base_url = base_url.rstrip("/")
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.bucket = TokenBucket(rate, burst)
+        self.session = requests.Session()
+        self.session.params = {"api_key": api_key, "language": "en-US"}
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.stats = {"requests": 0, "retries": 0, "throttled": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, key):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def get(self, path, params=None):
+        """GET a TMDB endpoint and return the decoded JSON."""
+        url = f"{self.base_url}{path}"
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            self._count("requests")
+            backoff = RETRY_BACKOFF_SECONDS * 2 ** attempt * random.uniform(0.5, 1.5)
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.max_retries:
+                    raise
+                self._count("retries")
+                time.sleep(backoff)
+                continue
+
+            if response.status_code == 429 or response.status_code >= 500:
+                if attempt == self.max_retries:
+                    response.raise_for_status()
+                self._count("retries")
+                if response.status_code == 429:
+                    self._count("throttled")
+                    delay = min(MAX_RETRY_AFTER_SECONDS, max(backoff, retry_after_seconds(response) or 0))
+                    self.bucket.pause(delay)
+                else:
+                    delay = backoff
+                time.sleep(delay)
+                continue
+
+            response.raise_for_status()
+            return response.json()
+
+    def close(self):
+        self.session.close()
+
+
+def fetch_discover_page(client, page, min_vote_count):
+    return client.get("/discover/movie", {"page": page, "min_vote_count": min_vote_count})
+
+
+def fetch_movie_detail(client, movie_id):
+    """Fetch one movie with credits; returns (movie_id, detail or None, error or None)."""
+    try:
+        return movie_id, client.get(f"/movie/{movie_id}", {"append_to_response": "credits"}), None
+    except Exception as e:
+        return movie_id, None, e
+
+
+def fetch_movies(api_key: str, count: int = 50, min_vote_count: int = 1000, client=None):
+    """
+    Fetch popular movies from TMDB.
+
+    Discover pages and movie details are fetched concurrently on
+    `client.concurrency` threads, but results keep discover order, so the
+    same movies are returned as a one-at-a-time fetch would return.
+    """
+    own_client = client is None
+    client = client or TMDBClient(api_key)
     movies = []
     page = 1
+    total_pages = None
+    started = time.perf_counter()
     
-    print(f"Fetching {count} movies with at least {min_vote_count} vote count")
+    print(f"Fetching {count} movies with at least {min_vote_count} vote count "
+          f"({client.concurrency} threads, {client.bucket.rate:g} requests/s)")
     
-    while len(movies) < count:
-        url = f"{base_url}/discover/movie"
-        params = {
-            "api_key": api_key,
-            "page": page,
-            "language": "en-US",
-            "min_vote_count": min_vote_count
-        }
-        
-        try:
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            for movie in data.get("results", []):
-                if len(movies) >= count:
+    try:
+        with ThreadPoolExecutor(max_workers=client.concurrency) as executor:
+            while len(movies) < count and (total_pages is None or page <= total_pages):
+                # Enough pages to cover what is still missing if every movie on them is complete
+                wanted = max(1, math.ceil((count - len(movies)) / DISCOVER_PAGE_SIZE))
+                if total_pages is not None:
+                    wanted = min(wanted, total_pages - page + 1)
+                pages = list(range(page, page + wanted))
+                
+                try:
+                    results = list(executor.map(fetch_discover_page, repeat(client), pages, repeat(min_vote_count)))
+                except Exception as e:
+                    print(f"Error fetching pages {pages[0]}-{pages[-1]}: {e}")
                     break
                 
-                # Fetch detailed movie info
-                movie_id = movie["id"]
-                detail_url = f"{base_url}/movie/{movie_id}"
-                detail_params = {
-                    "api_key": api_key,
-                    "language": "en-US",
-                    "append_to_response": "credits"
-                }
+                movie_ids = []
+                for data in results:
+                    total_pages = min(data.get("total_pages") or MAX_DISCOVER_PAGES, MAX_DISCOVER_PAGES)
+                    movie_ids += [movie["id"] for movie in data.get("results", [])]
+                if not movie_ids:
+                    break
+                page += wanted
                 
-                try:
-                    detail_response = requests.get(detail_url, params=detail_params, timeout=10)
-                    detail_response.raise_for_status()
-                    movie_detail = detail_response.json()
-                    
-                    if is_movie_complete(movie_detail):
+                for movie_id, movie_detail, error in executor.map(fetch_movie_detail, repeat(client), movie_ids):
+                    if len(movies) >= count:
+                        break
+                    if error is not None:
+                        print(f"  ✗ Failed to fetch details for movie {movie_id}: {error}")
+                    elif is_movie_complete(movie_detail):
                         movies.append(movie_detail)
                         print(f"  ✓ Added complete movie: {movie_detail.get('title')} ({movie_detail.get('release_date')})")
                     else:
                         print(f"  ✗ Skipped incomplete movie: {movie_detail.get('title', 'Unknown')}")
-                        continue
-                except Exception as e:
-                    print(f"  ✗ Failed to fetch details for movie {movie_id}: {e}")
-                    continue
-            
-            if not data.get("results"):
-                break
-            
-            page += 1
-            
-        except Exception as e:
-            print(f"Error fetching page {page}: {e}")
-            break
+    finally:
+        if own_client:
+            client.close()
     
+    elapsed = time.perf_counter() - started
+    stats = client.stats
+    rate = stats["requests"] / elapsed if elapsed > 0 else 0
+    print(f"Fetched {len(movies)} movies with {stats['requests']} requests in {elapsed:.1f}s "
+          f"({rate:.1f} requests/s, {stats['retries']} retries, {stats['throttled']} throttled)")
     return movies[:count]
 
 
@@ -318,15 +476,44 @@ def main():
         default=1000,
         help="Minimum vote count (default: 1000)"
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Concurrent requests (default: {DEFAULT_CONCURRENCY})"
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=DEFAULT_RATE,
+        help=f"Maximum requests per second (default: {DEFAULT_RATE:g})"
+    )
+    parser.add_argument(
+        "--burst",
+        type=int,
+        default=DEFAULT_BURST,
+        help=f"Requests allowed in a burst above the rate (default: {DEFAULT_BURST})"
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=DEFAULT_MAX_RETRIES,
+        help=f"Retries per request after a 429, 5xx or network error (default: {DEFAULT_MAX_RETRIES})"
+    )
+    parser.add_argument(
+        "--base-url",
+        default=DEFAULT_BASE_URL,
+        help=f"TMDB API root, e.g. a local mock server (default: {DEFAULT_BASE_URL})"
+    )
     
     args = parser.parse_args()
+    if args.concurrency < 1 or args.rate <= 0 or args.burst < 1 or args.max_retries < 0:
+        parser.error("--concurrency and --burst must be at least 1, --rate positive and --max-retries not negative")
     
     try:
         # Setup database schema if requested
         if args.setup_db:
             print("Setting up database schema...")
-            # Import here to avoid circular dependencies
-            from scripts.setup_db import create_schema
             create_schema()
             print()
         
@@ -334,7 +521,14 @@ def main():
         api_key = get_tmdb_api_key()
         
         # Fetch movies
-        tmdb_movies = fetch_movies(api_key, args.count, args.vote)
+        client = TMDBClient(
+            api_key, base_url=args.base_url, concurrency=args.concurrency,
+            rate=args.rate, burst=args.burst, max_retries=args.max_retries
+        )
+        try:
+            tmdb_movies = fetch_movies(api_key, args.count, args.vote, client=client)
+        finally:
+            client.close()
         
         if not tmdb_movies:
             print("No movies fetched. Check your API key and internet connection.")
@@ -359,9 +553,13 @@ def main():
                 print(f"  ✗ Error processing {tmdb_movie.get('title', 'Unknown')}: {e}")
                 continue
         
+        if inserted:
+            refresh_movie_summary()
+            bump_dataset_version()
+        
         print(f"\n✅ Successfully inserted {inserted} movies!")
         print(f"\nNext steps:")
-        print(f"  1. Run enrichment script: python scripts/enrich_data.py")
+        print(f"  1. Run enrichment script: python scripts/enrich_data.py --incremental")
         print(f"  2. Ingest to Neo4j: python scripts/ingest_to_neo4j.py")
         
     except ValueError as e:
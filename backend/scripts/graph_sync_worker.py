@@ -0,0 +1,195 @@
+"""
+Graph sync worker: keeps Neo4j in step with Postgres as changes are committed.
+
+LISTENs on the graph_changes channel (see the graph_change_feed migration).
+After the first notification it keeps collecting for --window seconds, then
+applies everything that changed with one incremental sync (the same batched
+UNWIND transactions as `ingest_to_neo4j.py --incremental`). A sync also runs
+every --poll-interval seconds without notifications, so nothing is lost if
+the worker was down or its connection dropped. Neo4j constraints and
+indexes are ensured once at startup, not on every sync.
+
+After each sync it prints the lag: seconds from the oldest change it
+applied to the end of the sync, and row versions still behind Postgres. The
+lag is also stored in graph_sync_watermark and served at /health/graph-sync.
+
+Usage:
+    python scripts/graph_sync_worker.py
+    python scripts/graph_sync_worker.py --window 2 --batch-size 5000 --workers 4
+"""
+import sys
+import json
+import time
+import select
+import argparse
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from neo4j.exceptions import Neo4jError, ServiceUnavailable, SessionExpired
+
+from app.database import get_postgres_connection
+from scripts.migrate import GRAPH_CHANGES_CHANNEL
+from scripts.ingest_to_neo4j import (
+    DEFAULT_BATCH_SIZE, DEFAULT_WORKERS, Neo4jIngester, current_row_version, get_watermark, workers_arg
+)
+
+DEFAULT_WINDOW = 1.0
+DEFAULT_POLL_INTERVAL = 60.0
+MAX_BACKOFF_SECONDS = 60.0
+
+
+class GraphSyncWorker:
+    def __init__(self, ingester, window=DEFAULT_WINDOW, poll_interval=DEFAULT_POLL_INTERVAL):
+        self.ingester = ingester
+        self.window = window
+        self.poll_interval = poll_interval
+        self.conn = None
+        self.schema_ready = False  # ensure_schema() runs once, not on every sync
+        self.pending = []  # Events received but not yet applied
+        self.metrics = {
+            "syncs": 0, "events": 0, "failures": 0,
+            "last_lag_seconds": None, "max_lag_seconds": None, "versions_behind": None,
+        }
+
+    def connect(self):
+        """Open a dedicated autocommit connection and LISTEN on the change channel."""
+        self.close()
+        self.conn = get_postgres_connection()
+        self.conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        with self.conn.cursor() as cursor:
+            cursor.execute(f"LISTEN {GRAPH_CHANGES_CHANNEL};")
+        print(f"Listening on {GRAPH_CHANGES_CHANNEL}")
+
+    def close(self):
+        if self.conn is not None and not self.conn.closed:
+            self.conn.close()
+        self.conn = None
+
+    def wait_for_events(self, timeout):
+        """Wait up to `timeout` seconds and return any notifications received."""
+        if timeout > 0 and not self.conn.notifies:
+            select.select([self.conn], [], [], timeout)
+        self.conn.poll()
+        events = []
+        while self.conn.notifies:
+            notify = self.conn.notifies.pop(0)
+            try:
+                events.append(json.loads(notify.payload))
+            except ValueError:
+                events.append({"table": None, "at": time.time()})
+        return events
+
+    def collect(self):
+        """
+        Block until changes arrive (or the poll interval passes), then coalesce.
+
+        Once something arrives, keep collecting for `window` seconds so a
+        burst of writes is applied as one sync.
+        """
+        events = self.wait_for_events(self.poll_interval)
+        if events:
+            deadline = time.monotonic() + self.window
+            while (remaining := deadline - time.monotonic()) > 0:
+                events += self.wait_for_events(remaining)
+        return events
+
+    def sync(self, events):
+        """Apply everything changed since the watermark and report lag."""
+        oldest = min((e["at"] for e in events if e.get("at") is not None), default=None)
+        started = time.perf_counter()
+        stats = self.ingester.ingest_incremental(oldest_change=oldest)
+        elapsed = time.perf_counter() - started
+
+        lag = time.time() - oldest if oldest is not None else None
+        behind = current_row_version() - get_watermark()[0]
+        rows = sum(phase.get("rows", 0) for phase in stats.values())
+        tables = sorted({e["table"] for e in events if e.get("table")})
+
+        self.metrics["syncs"] += 1
+        self.metrics["events"] += len(events)
+        self.metrics["versions_behind"] = behind
+        if lag is not None:
+            self.metrics["last_lag_seconds"] = round(lag, 3)
+            self.metrics["max_lag_seconds"] = round(max(lag, self.metrics["max_lag_seconds"] or 0), 3)
+
+        lag_text = f"lag {lag:.2f}s" if lag is not None else "periodic check"
+        print(
+            f"[sync] {len(events)} events ({', '.join(tables) or 'none'}) → {rows} rows in {elapsed:.2f}s, "
+            f"{lag_text}, {behind} versions behind"
+        )
+        print(f"[metrics] {json.dumps(self.metrics)}")
+
+    def run(self):
+        backoff = 1.0
+        while True:
+            try:
+                if not self.schema_ready:
+                    self.ingester.ensure_schema()
+                    self.schema_ready = True
+                if self.conn is None:
+                    self.connect()
+                    # Sync right away to catch up on anything committed while nobody was listening
+                elif not self.pending:
+                    self.pending = self.collect()
+                self.sync(self.pending)
+                self.pending = []
+                backoff = 1.0
+            except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+                print(f"✗ Postgres connection lost: {e}; reconnecting in {backoff:.0f}s")
+                self.close()
+            except (ServiceUnavailable, SessionExpired, Neo4jError) as e:
+                # Keep the pending events so their lag is still measured from the original change
+                print(f"✗ Neo4j sync failed: {e}; retrying in {backoff:.0f}s")
+            except Exception as e:
+                # Anything else (a bad row, a bug) must not kill the worker; back off and retry the same events
+                print(f"✗ Graph sync failed unexpectedly: {e!r}; retrying in {backoff:.0f}s")
+            else:
+                continue
+            self.metrics["failures"] += 1
+            time.sleep(backoff)
+            backoff = min(backoff * 2, MAX_BACKOFF_SECONDS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Continuously sync Postgres changes into Neo4j")
+    parser.add_argument(
+        "--window",
+        type=float,
+        default=DEFAULT_WINDOW,
+        help=f"Seconds to keep collecting changes after the first one before syncing (default: {DEFAULT_WINDOW})"
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=DEFAULT_POLL_INTERVAL,
+        help=f"Sync at least this often even without notifications (default: {DEFAULT_POLL_INTERVAL})"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"Rows per UNWIND write transaction (default: {DEFAULT_BATCH_SIZE})"
+    )
+    parser.add_argument(
+        "--workers",
+        type=workers_arg,
+        default=DEFAULT_WORKERS,
+        help=f"Concurrent writers per sync (default: {DEFAULT_WORKERS})"
+    )
+    args = parser.parse_args()
+
+    ingester = Neo4jIngester(batch_size=args.batch_size, workers=args.workers)
+    worker = GraphSyncWorker(ingester, window=args.window, poll_interval=args.poll_interval)
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        print("Stopping graph sync worker")
+    finally:
+        worker.close()
+        ingester.close()
+
+
+if __name__ == "__main__":
+    main()
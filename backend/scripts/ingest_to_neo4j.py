@@ -8,20 +8,490 @@ This script loads enriched movie data from Postgres into Neo4j, creating:
 - Genre nodes
 - Relationships: ACTED_IN, DIRECTED, HAS_GENRE
 
-The script avoids duplicates by checking for existing nodes before creation.
+By default the graph is wiped and rebuilt. With --incremental only rows whose
+row_version is above the stored watermark, or whose transaction had not
+committed when the last sync read, are applied. The delete tombstones
+recorded since then are replayed first (see the change_tracking and
+sync_snapshots migrations).
+With --blue-green the graph is rebuilt in a shadow database and the
+NEO4J_DATABASE alias is switched to it once its counts match Postgres.
+With --export-import-files nothing is loaded; node and relationship CSVs are
+written for an offline `neo4j-admin database import` of a new database.
+
+Nodes and relationships are MERGEd, so re-running never creates duplicates.
+Uniqueness constraints on every node id (and indexes on the properties the
+chat agent filters on) are created first, so each MERGE/MATCH is an index
+lookup rather than a label scan.
+Rows are sent in chunks of --batch-size through `UNWIND $rows AS row ...`,
+one explicit write transaction per chunk, and each phase reports rows/sec.
+Postgres rows are read in --batch-size chunks through named server-side
+cursors and written as they arrive, so memory use does not grow with the
+catalog. With --workers N each phase is split into N id ranges loaded concurrently,
+node phases first and then the three relationship phases together.
+
+Usage:
+    python scripts/ingest_to_neo4j.py
+    python scripts/ingest_to_neo4j.py --batch-size 5000
+    python scripts/ingest_to_neo4j.py --workers 4
+    python scripts/ingest_to_neo4j.py --incremental
+    python scripts/ingest_to_neo4j.py --blue-green
+    python scripts/ingest_to_neo4j.py --export-import-files ./graph-import --gzip
+    python scripts/ingest_to_neo4j.py --wipe-only --labels Movie Genre
 """
 import sys
 import os
+import re
+import gzip
+import json
+import time
+import random
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from itertools import groupby
+from operator import itemgetter
+from pathlib import Path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.config import settings
-from app.database import get_db_cursor
+from app.database import get_db_cursor, get_postgres_connection, partition_query, split_range, stream_query
+from scripts.migrate import CHANGE_TRACKED_TABLES
+from scripts.setup_db import bump_dataset_version
 from neo4j import GraphDatabase
+from neo4j.exceptions import TransientError
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_WORKERS = 1
+DEFAULT_DELETE_BATCH_SIZE = 10000
+
+# Labels are interpolated into Cypher when scoping a wipe, so they must be plain identifiers
+LABEL_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+# Concurrent writers can deadlock on shared nodes (e.g. two partitions MERGEing
+# edges onto the same actor). The driver already retries transient errors for
+# a while; a chunk that still fails is retried this many more times with jittered
+# exponential backoff before the run gives up.
+MAX_WRITE_RETRIES = 5
+RETRY_BACKOFF_SECONDS = 0.5
+
+# Created with IF NOT EXISTS, so the schema step is safe to run before every load.
+# A uniqueness constraint also backs the id lookups with an index.
+SCHEMA_STATEMENTS = [
+    "CREATE CONSTRAINT movie_id IF NOT EXISTS FOR (m:Movie) REQUIRE m.id IS UNIQUE",
+    "CREATE CONSTRAINT actor_id IF NOT EXISTS FOR (a:Actor) REQUIRE a.id IS UNIQUE",
+    "CREATE CONSTRAINT director_id IF NOT EXISTS FOR (d:Director) REQUIRE d.id IS UNIQUE",
+    "CREATE CONSTRAINT genre_id IF NOT EXISTS FOR (g:Genre) REQUIRE g.id IS UNIQUE",
+    # Properties filtered on by the chat agent's example queries (app/agents/neo4j_tool.py)
+    "CREATE INDEX movie_title IF NOT EXISTS FOR (m:Movie) ON (m.title)",
+    "CREATE INDEX movie_enrichment_score IF NOT EXISTS FOR (m:Movie) ON (m.enrichment_score)",
+    "CREATE INDEX actor_name IF NOT EXISTS FOR (a:Actor) ON (a.name)",
+    "CREATE INDEX director_name IF NOT EXISTS FOR (d:Director) ON (d.name)",
+]
+
+# Seconds to wait for new indexes to come online before loading
+INDEX_WAIT_SECONDS = 300
+
+MOVIE_NODES_CYPHER = """
+    UNWIND $rows AS row
+    MERGE (m:Movie {id: row.id})
+    SET m.title = row.title,
+        m.release_year = row.release_year,
+        m.rating = row.rating,
+        m.description = row.description,
+        m.duration_minutes = row.duration_minutes,
+        m.budget = row.budget,
+        m.revenue = row.revenue,
+        m.language = row.language,
+        m.country = row.country,
+        m.enrichment_score = row.enrichment_score,
+        m.popularity_tier = row.popularity_tier
+"""
+
+ACTOR_NODES_CYPHER = """
+    UNWIND $rows AS row
+    MERGE (a:Actor {id: row.id})
+    SET a.name = row.name
+"""
+
+DIRECTOR_NODES_CYPHER = """
+    UNWIND $rows AS row
+    MERGE (d:Director {id: row.id})
+    SET d.name = row.name
+"""
+
+GENRE_NODES_CYPHER = """
+    UNWIND $rows AS row
+    MERGE (g:Genre {id: row.id})
+    SET g.name = row.name
+"""
+
+ACTED_IN_CYPHER = """
+    UNWIND $rows AS row
+    MATCH (a:Actor {id: row.actor_id})
+    MATCH (m:Movie {id: row.movie_id})
+    MERGE (a)-[:ACTED_IN]->(m)
+"""
+
+DIRECTED_CYPHER = """
+    UNWIND $rows AS row
+    MATCH (d:Director {id: row.director_id})
+    MATCH (m:Movie {id: row.movie_id})
+    MERGE (d)-[:DIRECTED]->(m)
+"""
+
+HAS_GENRE_CYPHER = """
+    UNWIND $rows AS row
+    MATCH (m:Movie {id: row.movie_id})
+    MATCH (g:Genre {id: row.genre_id})
+    MERGE (m)-[:HAS_GENRE]->(g)
+"""
+
+# For changed movies: drop the current DIRECTED edge and link the movie's director, if any
+SYNC_DIRECTED_CYPHER = """
+    UNWIND $rows AS row
+    MATCH (m:Movie {id: row.movie_id})
+    OPTIONAL MATCH (:Director)-[old:DIRECTED]->(m)
+    DELETE old
+    WITH DISTINCT m, row
+    WHERE row.director_id IS NOT NULL
+    MATCH (d:Director {id: row.director_id})
+    MERGE (d)-[:DIRECTED]->(m)
+"""
+
+# Cypher replaying each kind of graph_tombstones row
+TOMBSTONE_CYPHER = {
+    "movie": "UNWIND $rows AS row MATCH (n:Movie {id: row.entity_id}) DETACH DELETE n",
+    "actor": "UNWIND $rows AS row MATCH (n:Actor {id: row.entity_id}) DETACH DELETE n",
+    "director": "UNWIND $rows AS row MATCH (n:Director {id: row.entity_id}) DETACH DELETE n",
+    "genre": "UNWIND $rows AS row MATCH (n:Genre {id: row.entity_id}) DETACH DELETE n",
+    "movie_actor": """
+        UNWIND $rows AS row
+        MATCH (:Actor {id: row.related_id})-[r:ACTED_IN]->(:Movie {id: row.entity_id})
+        DELETE r
+    """,
+    "movie_genre": """
+        UNWIND $rows AS row
+        MATCH (:Movie {id: row.entity_id})-[r:HAS_GENRE]->(:Genre {id: row.related_id})
+        DELETE r
+    """,
+}
+
+
+def to_float(value):
+    """Neo4j has no DECIMAL type; send NUMERIC columns as floats."""
+    return float(value) if value is not None else None
+
+
+def movie_row(movie):
+    """Movie row from Postgres as UNWIND parameters."""
+    return {
+        **movie,
+        'rating': to_float(movie['rating']),
+        'budget': to_float(movie['budget']),
+        'revenue': to_float(movie['revenue']),
+        'enrichment_score': to_float(movie['enrichment_score']),
+    }
+
+
+MOVIES_SQL = """
+    SELECT id, title, release_year, rating, description, duration_minutes, budget, revenue,
+           language, country, enrichment_score, popularity_tier
+    FROM movies
+"""
+ACTORS_SQL = "SELECT id, name FROM actors"
+DIRECTORS_SQL = "SELECT id, name FROM directors"
+GENRES_SQL = "SELECT id, name FROM genres"
+MOVIE_ACTORS_SQL = "SELECT movie_id, actor_id FROM movie_actors"
+MOVIE_DIRECTORS_SQL = "SELECT id AS movie_id, director_id FROM movies"
+MOVIE_GENRES_SQL = "SELECT movie_id, genre_id FROM movie_genres"
+
+# Rows not yet synced: those with a version above the last sync's, plus those
+# whose writing transaction the last sync's snapshot could not see. Those may
+# hold lower versions because they committed late. Bounded above so rows
+# committed mid-sync wait for the next one.
+NOT_VISIBLE_IN_SNAPSHOT = """
+    row_xid >= pg_snapshot_xmin(%(snapshot)s::pg_snapshot)
+    AND NOT pg_visible_in_snapshot(row_xid, %(snapshot)s::pg_snapshot)
+"""
+CHANGED_SINCE = f"""
+    WHERE row_version <= %(until)s
+      AND (row_version > %(since)s OR ({NOT_VISIBLE_IN_SNAPSHOT}))
+"""
+
+# (phase name, Postgres query, partition key, Cypher, row transform).
+# Phases run in stages: every node phase first, so the relationship phases can
+# MATCH both ends. Phases within a stage are independent and may run at once.
+INGEST_STAGES = [
+    [
+        ("movie nodes", MOVIES_SQL, "id", MOVIE_NODES_CYPHER, movie_row),
+        ("actor nodes", ACTORS_SQL, "id", ACTOR_NODES_CYPHER, dict),
+        ("director nodes", DIRECTORS_SQL, "id", DIRECTOR_NODES_CYPHER, dict),
+        ("genre nodes", GENRES_SQL, "id", GENRE_NODES_CYPHER, dict),
+    ],
+    [
+        ("ACTED_IN relationships", MOVIE_ACTORS_SQL, "movie_id", ACTED_IN_CYPHER, dict),
+        ("DIRECTED relationships", MOVIE_DIRECTORS_SQL + " WHERE director_id IS NOT NULL", "movie_id", DIRECTED_CYPHER, dict),
+        ("HAS_GENRE relationships", MOVIE_GENRES_SQL, "movie_id", HAS_GENRE_CYPHER, dict),
+    ],
+]
+
+# Same phases restricted to changed rows. Changed movies re-link their director
+# (including to none), since the old DIRECTED edge has no row of its own.
+INCREMENTAL_STAGES = [
+    [
+        ("movie nodes", MOVIES_SQL + CHANGED_SINCE, "id", MOVIE_NODES_CYPHER, movie_row),
+        ("actor nodes", ACTORS_SQL + CHANGED_SINCE, "id", ACTOR_NODES_CYPHER, dict),
+        ("director nodes", DIRECTORS_SQL + CHANGED_SINCE, "id", DIRECTOR_NODES_CYPHER, dict),
+        ("genre nodes", GENRES_SQL + CHANGED_SINCE, "id", GENRE_NODES_CYPHER, dict),
+    ],
+    [
+        ("ACTED_IN relationships", MOVIE_ACTORS_SQL + CHANGED_SINCE, "movie_id", ACTED_IN_CYPHER, dict),
+        ("DIRECTED relationships", MOVIE_DIRECTORS_SQL + CHANGED_SINCE, "movie_id", SYNC_DIRECTED_CYPHER, dict),
+        ("HAS_GENRE relationships", MOVIE_GENRES_SQL + CHANGED_SINCE, "movie_id", HAS_GENRE_CYPHER, dict),
+    ],
+]
+
+
+def check_workers(workers):
+    """Raise ValueError unless every worker can hold a pooled Postgres connection at once."""
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    # Each worker keeps a connection checked out while it streams its partition.
+    # run_stages takes no other connection while partitions run, so the whole
+    # pool may be used.
+    if workers > settings.postgres_pool_max_size:
+        raise ValueError(
+            f"workers ({workers}) exceeds the Postgres pool size ({settings.postgres_pool_max_size}); "
+            "use fewer workers or raise POSTGRES_POOL_MAX_SIZE"
+        )
+
+
+def workers_arg(value):
+    """argparse type for --workers."""
+    try:
+        workers = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    try:
+        check_workers(workers)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return workers
+
+
+# (what, Postgres count, Neo4j count) compared before a blue/green switch
+GRAPH_COUNTS = [
+    ("Movie nodes", "SELECT COUNT(*) AS count FROM movies", "MATCH (n:Movie) RETURN count(n) AS count"),
+    ("Actor nodes", "SELECT COUNT(*) AS count FROM actors", "MATCH (n:Actor) RETURN count(n) AS count"),
+    ("Director nodes", "SELECT COUNT(*) AS count FROM directors", "MATCH (n:Director) RETURN count(n) AS count"),
+    ("Genre nodes", "SELECT COUNT(*) AS count FROM genres", "MATCH (n:Genre) RETURN count(n) AS count"),
+    ("ACTED_IN relationships", "SELECT COUNT(*) AS count FROM movie_actors", "MATCH ()-[r:ACTED_IN]->() RETURN count(r) AS count"),
+    ("DIRECTED relationships", "SELECT COUNT(*) AS count FROM movies WHERE director_id IS NOT NULL", "MATCH ()-[r:DIRECTED]->() RETURN count(r) AS count"),
+    ("HAS_GENRE relationships", "SELECT COUNT(*) AS count FROM movie_genres", "MATCH ()-[r:HAS_GENRE]->() RETURN count(r) AS count"),
+]
+
+# Suffixes of the two databases a blue/green alias alternates between
+GENERATIONS = ("blue", "green")
+
+# Arbitrary key for pg_advisory_lock, held by whatever is writing the graph
+GRAPH_SYNC_LOCK_ID = 748_211_002
+
+
+# (kind, label or type, file stem, neo4j-admin header, COPY query) for the offline import.
+# Ids are written as integers; the importer must run with --id-type=INTEGER so
+# they land as the same integer `id` properties the MERGE-based load uses.
+# Decimals are typed :double (neo4j-admin's :float is 32-bit), matching the
+# Python floats the MERGE-based load sends.
+BULK_EXPORTS = [
+    ("nodes", "Movie", "movies",
+     "id:ID(Movie),title,release_year:int,rating:double,description,duration_minutes:int,"
+     "budget:double,revenue:double,language,country,enrichment_score:double,popularity_tier,:LABEL",
+     """SELECT id, title, release_year, rating, description, duration_minutes, budget, revenue,
+               language, country, enrichment_score, popularity_tier, 'Movie'
+        FROM movies ORDER BY id"""),
+    ("nodes", "Actor", "actors", "id:ID(Actor),name,:LABEL", "SELECT id, name, 'Actor' FROM actors ORDER BY id"),
+    ("nodes", "Director", "directors", "id:ID(Director),name,:LABEL", "SELECT id, name, 'Director' FROM directors ORDER BY id"),
+    ("nodes", "Genre", "genres", "id:ID(Genre),name,:LABEL", "SELECT id, name, 'Genre' FROM genres ORDER BY id"),
+    ("relationships", "ACTED_IN", "acted_in", ":START_ID(Actor),:END_ID(Movie),:TYPE",
+     "SELECT actor_id, movie_id, 'ACTED_IN' FROM movie_actors"),
+    ("relationships", "DIRECTED", "directed", ":START_ID(Director),:END_ID(Movie),:TYPE",
+     "SELECT director_id, id, 'DIRECTED' FROM movies WHERE director_id IS NOT NULL"),
+    ("relationships", "HAS_GENRE", "has_genre", ":START_ID(Movie),:END_ID(Genre),:TYPE",
+     "SELECT movie_id, genre_id, 'HAS_GENRE' FROM movie_genres"),
+]
+
+
+def export_bulk_import(directory, compress=False):
+    """
+    Write node and relationship CSVs for `neo4j-admin database import`, plus a manifest.
+
+    Each table is streamed with COPY ... TO STDOUT straight into its file
+    (gzip-compressed with `compress`), with headers in separate files. All
+    files come from one REPEATABLE READ snapshot so relationships never point
+    at nodes missing from the node files. manifest.json lists the files, row
+    counts, the import command and the row version the export covers.
+    """
+    out = Path(directory)
+    out.mkdir(parents=True, exist_ok=True)
+    suffix = ".csv.gz" if compress else ".csv"
+    files = []
+    started = time.perf_counter()
+    with get_db_cursor() as cursor:
+        cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY")
+        # First statement, so this is the snapshot every COPY below reads from
+        cursor.execute(SYNC_POINT_SQL)
+        point = cursor.fetchone()
+        row_version, snapshot = point["version"], point["snapshot"]
+        for kind, name, stem, header, query in BULK_EXPORTS:
+            header_path = out / f"{stem}_header.csv"
+            data_path = out / f"{stem}{suffix}"
+            header_path.write_text(header + "\n", encoding="utf-8")
+            
+            opener = gzip.open if compress else open
+            with opener(data_path, "wt", encoding="utf-8", newline="") as f:
+                cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT csv)", f)
+            rows = cursor.rowcount
+            print(f"  ✓ {rows} {name} {kind} → {data_path.name}")
+            files.append({
+                "kind": kind, "name": name, "rows": rows,
+                "header": header_path.name, "data": data_path.name,
+                "bytes": data_path.stat().st_size,
+            })
+    
+    args = [f"--{f['kind']}={f['header']},{f['data']}" for f in files]
+    manifest = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "row_version": row_version,
+        "snapshot": snapshot,
+        "compressed": compress,
+        "files": files,
+        "import_command": (
+            "neo4j-admin database import full --id-type=INTEGER --multiline-fields=true "
+            + " ".join(args) + f" {settings.neo4j_database}"
+        ),
+        "after_import": (
+            f"python scripts/ingest_to_neo4j.py --set-watermark {row_version} --watermark-snapshot {snapshot}"
+            " && python scripts/ingest_to_neo4j.py --incremental"
+        ),
+    }
+    (out / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    
+    elapsed = time.perf_counter() - started
+    print(f"✅ Exported {sum(f['rows'] for f in files)} rows to {out} in {elapsed:.2f}s")
+    print(f"Import with (from {out}, Neo4j stopped):\n  {manifest['import_command']}")
+    return manifest
+
+
+def current_row_version():
+    """Highest row version handed out so far (0 if nothing has been written)."""
+    with get_db_cursor() as cursor:
+        cursor.execute("SELECT COALESCE(pg_sequence_last_value('row_version_seq'), 0) AS version")
+        return cursor.fetchone()["version"]
+
+
+SYNC_POINT_SQL = """
+    SELECT COALESCE(pg_sequence_last_value('row_version_seq'), 0) AS version,
+           pg_current_snapshot()::text AS snapshot
+"""
+
+
+def sync_point():
+    """
+    (row version, snapshot) to record for a sync that starts reading now.
+
+    Versions at or below the returned one may still belong to uncommitted
+    transactions. The snapshot says which transactions had committed, so the
+    next sync can pick those rows up once they commit.
+    """
+    with get_db_cursor() as cursor:
+        cursor.execute(SYNC_POINT_SQL)
+        point = cursor.fetchone()
+        return point["version"], point["snapshot"]
+
+
+def get_watermark():
+    """(row version, snapshot) the graph was last synced up to ((0, None) if never)."""
+    with get_db_cursor() as cursor:
+        cursor.execute("SELECT row_version, snapshot::text AS snapshot FROM graph_sync_watermark")
+        row = cursor.fetchone()
+        return (row["row_version"], row["snapshot"]) if row else (0, None)
+
+
+def changes_pending(snapshot):
+    """True if rows (or tombstones) were written by transactions `snapshot` could not see."""
+    if snapshot is None:
+        return False
+    checks = " OR ".join(
+        f"EXISTS (SELECT 1 FROM {table} WHERE {NOT_VISIBLE_IN_SNAPSHOT})"
+        for table in CHANGE_TRACKED_TABLES + ["graph_tombstones"]
+    )
+    with get_db_cursor() as cursor:
+        cursor.execute(f"SELECT {checks} AS pending", {"snapshot": snapshot})
+        return cursor.fetchone()["pending"]
+
+
+def set_watermark(version, snapshot=None, lag_seconds=None):
+    """
+    Record a completed sync and drop the tombstones it has applied.
+
+    Tombstones whose transaction `snapshot` could not see are kept for the
+    next sync. Without a snapshot, every tombstone up to `version` is
+    dropped.
+    """
+    params = {"version": version, "snapshot": snapshot, "lag_seconds": lag_seconds}
+    with get_db_cursor() as cursor:
+        cursor.execute("""
+            INSERT INTO graph_sync_watermark (id, row_version, snapshot, lag_seconds)
+            VALUES (TRUE, %(version)s, %(snapshot)s::pg_snapshot, %(lag_seconds)s)
+            ON CONFLICT (id) DO UPDATE
+            SET row_version = EXCLUDED.row_version, snapshot = EXCLUDED.snapshot,
+                lag_seconds = EXCLUDED.lag_seconds, synced_at = now()
+        """, params)
+        cursor.execute("""
+            DELETE FROM graph_tombstones
+            WHERE row_version <= %(version)s
+              AND (%(snapshot)s::pg_snapshot IS NULL OR pg_visible_in_snapshot(row_xid, %(snapshot)s::pg_snapshot))
+        """, params)
+
+
+@contextmanager
+def graph_sync_lock():
+    """
+    Hold the graph sync lock for the duration of the block.
+
+    Full, incremental and blue/green syncs, wipes and --set-watermark all take
+    it, so only one of them writes the graph or the watermark at a time. The
+    sync worker therefore pauses while a rebuild runs instead of pruning
+    tombstones the rebuild's older sync point still needs. The lock lives on
+    its own connection outside the pool, so ingestion workers keep the whole
+    pool.
+    """
+    conn = get_postgres_connection()
+    try:
+        conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT pg_try_advisory_lock(%s)", (GRAPH_SYNC_LOCK_ID,))
+            if not cursor.fetchone()[0]:
+                print("Waiting for another graph sync to finish...")
+                cursor.execute("SELECT pg_advisory_lock(%s)", (GRAPH_SYNC_LOCK_ID,))
+        yield
+    finally:
+        conn.close()  # Ends the session, which releases the lock
 
 
 class Neo4jIngester:
-    def __init__(self):
-        self.driver = GraphDatabase.driver(
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, workers=DEFAULT_WORKERS, delete_batch_size=DEFAULT_DELETE_BATCH_SIZE, database=None, driver=None):
+        if batch_size < 1 or delete_batch_size < 1:
+            raise ValueError("batch sizes must be at least 1")
+        check_workers(workers)
+        self.batch_size = batch_size
+        self.workers = workers
+        self.delete_batch_size = delete_batch_size
+        self.database = database or settings.neo4j_database
+        # Any object with the driver's session()/close() API works, e.g. a benchmark stand-in
+        self.driver = driver or GraphDatabase.driver(
             settings.neo4j_uri,
             auth=(settings.neo4j_user, settings.neo4j_password)
         )
@@ -29,175 +499,416 @@ class Neo4jIngester:
     def close(self):
         self.driver.close()
     
-    def clear_database(self):
-        """Clear all nodes and relationships (for clean re-ingestion)."""
-        with self.driver.session() as session:
-            session.run("MATCH (n) DETACH DELETE n")
-            print("Cleared existing Neo4j data")
-    
-    def create_movie_node(self, session, movie_id, title, year, rating, description, duration_minutes, budget, revenue, language, country, enrichment_score, popularity_tier):
-        """Create or update a movie node."""
-        session.run("""
-            MERGE (m:Movie {id: $id})
-            SET m.title = $title,
-                m.release_year = $year,
-                m.rating = $rating,
-                m.description = $description,
-                m.duration_minutes = $duration_minutes,
-                m.budget = $budget,
-                m.revenue = $revenue,
-                m.language = $language,
-                m.country = $country,
-                m.enrichment_score = $enrichment_score,
-                m.popularity_tier = $popularity_tier
-        """, id=movie_id, title=title, year=year, rating=rating, description=description,
-            duration_minutes=duration_minutes, budget=budget, revenue=revenue,
-            language=language, country=country,
-            enrichment_score=enrichment_score, popularity_tier=popularity_tier)
-    
-    def create_actor_node(self, session, actor_id, name):
-        """Create or update an actor node."""
-        session.run("""
-            MERGE (a:Actor {id: $id})
-            SET a.name = $name
-        """, id=actor_id, name=name)
-    
-    def create_director_node(self, session, director_id, name):
-        """Create or update a director node."""
-        session.run("""
-            MERGE (d:Director {id: $id})
-            SET d.name = $name
-        """, id=director_id, name=name)
-    
-    def create_genre_node(self, session, genre_id, name):
-        """Create or update a genre node."""
-        session.run("""
-            MERGE (g:Genre {id: $id})
-            SET g.name = $name
-        """, id=genre_id, name=name)
-    
-    def create_relationship(self, session, rel_type, from_label, from_id, to_label, to_id, props=None):
-        """Create a relationship between two nodes."""
-        if props:
-            props_str = ", " + ", ".join([f"r.{k} = ${k}" for k in props.keys()])
-            query = f"""
-                MATCH (a:{from_label} {{id: $from_id}})
-                MATCH (b:{to_label} {{id: $to_id}})
-                MERGE (a)-[r:{rel_type}]->(b)
-                SET {props_str[2:]}
-            """
-            params = {"from_id": from_id, "to_id": to_id, **props}
-        else:
-            query = f"""
-                MATCH (a:{from_label} {{id: $from_id}})
-                MATCH (b:{to_label} {{id: $to_id}})
-                MERGE (a)-[:{rel_type}]->(b)
-            """
-            params = {"from_id": from_id, "to_id": to_id}
-        
-        session.run(query, **params)
+    def session(self):
+        """Session on the database this ingester writes to."""
+        return self.driver.session(database=self.database)
     
-    def ingest(self, clear_first=True):
-        """Main ingestion function."""
-        if clear_first:
-            self.clear_database()
+    @staticmethod
+    def _delete_chunk(tx, cypher, limit):
+        return tx.run(cypher, limit=limit).single()["deleted"]
+    
+    def _delete_in_chunks(self, session, what, count_cypher, delete_cypher):
+        """Run a `... WITH x LIMIT $limit DELETE x` statement until nothing is left."""
+        total = session.run(count_cypher).single()["total"]
+        deleted = 0
+        while True:
+            count = session.execute_write(self._delete_chunk, delete_cypher, self.delete_batch_size)
+            if count == 0:
+                break
+            deleted += count
+            print(f"  Deleted {deleted}/{total} {what}")
+        return deleted
+    
+    def clear_database(self, labels=None):
+        """
+        Clear nodes and relationships (for clean re-ingestion), a chunk at a time.
+
+        Relationships go first and then the nodes, `delete_batch_size` per
+        transaction, so neither a large graph nor a densely connected node
+        has to be deleted in one transaction. With `labels`, only nodes with
+        those labels (and every relationship touching them) are deleted.
+        """
+        for label in labels or []:
+            if not LABEL_PATTERN.match(label):
+                raise ValueError(f"Invalid node label: {label!r}")
         
-        print("Starting Neo4j ingestion...")
+        # Whatever was synced before is gone, so the next --incremental run reloads everything
+        set_watermark(0)
         
-        with self.driver.session() as session:
-            # Load movies with enriched data
-            with get_db_cursor() as cursor:
-                cursor.execute("""
-                    SELECT id, title, release_year, rating, description, duration_minutes, budget, revenue, 
-                           language, country, enrichment_score, popularity_tier, director_id
-                    FROM movies
-                """)
-                movies = cursor.fetchall()
-            
-            print(f"Creating {len(movies)} movie nodes...")
-            for movie in movies:
-                self.create_movie_node(
-                    session, movie['id'], movie['title'], movie['release_year'],
-                    float(movie['rating']) if movie['rating'] else None,
-                    movie['description'],
-                    movie['duration_minutes'],
-                    float(movie['budget']) if movie['budget'] else None,
-                    float(movie['revenue']) if movie['revenue'] else None,
-                    movie['language'],
-                    movie['country'],
-                    float(movie['enrichment_score']) if movie['enrichment_score'] else None,
-                    movie['popularity_tier']
+        started = time.perf_counter()
+        relationships = nodes = 0
+        with self.session() as session:
+            for label in labels or [None]:
+                node = f"(n:`{label}`)" if label else "(n)"
+                what = f"{label} " if label else ""
+                relationships += self._delete_in_chunks(
+                    session, f"{what}relationships",
+                    f"MATCH {node}-[r]-() RETURN count(DISTINCT r) AS total",
+                    f"MATCH {node}-[r]-() WITH DISTINCT r LIMIT $limit DELETE r RETURN count(*) AS deleted",
                 )
-            
-            # Load actors
-            with get_db_cursor() as cursor:
-                cursor.execute("SELECT id, name FROM actors")
-                actors = cursor.fetchall()
-            
-            print(f"Creating {len(actors)} actor nodes...")
-            for actor in actors:
-                self.create_actor_node(
-                    session, actor['id'], actor['name']
-                )
-            
-            # Load directors
-            with get_db_cursor() as cursor:
-                cursor.execute("SELECT id, name FROM directors")
-                directors = cursor.fetchall()
-            
-            print(f"Creating {len(directors)} director nodes...")
-            for director in directors:
-                self.create_director_node(
-                    session, director['id'], director['name']
+                nodes += self._delete_in_chunks(
+                    session, f"{what}nodes",
+                    f"MATCH {node} RETURN count(n) AS total",
+                    f"MATCH {node} WITH n LIMIT $limit DETACH DELETE n RETURN count(*) AS deleted",
                 )
+        
+        scope = ", ".join(labels) if labels else "all"
+        print(f"Cleared existing Neo4j data ({scope}): {nodes} nodes and {relationships} relationships in {time.perf_counter() - started:.2f}s")
+        return {"nodes": nodes, "relationships": relationships}
+    
+    def ensure_schema(self):
+        """Create id constraints and lookup indexes if missing, and wait until they are online."""
+        with self.session() as session:
+            for statement in SCHEMA_STATEMENTS:
+                session.run(statement).consume()
+            session.run("CALL db.awaitIndexes($timeout)", timeout=INDEX_WAIT_SECONDS).consume()
+        print(f"Ensured {len(SCHEMA_STATEMENTS)} Neo4j constraints and indexes")
+    
+    @staticmethod
+    def _run_batch(tx, cypher, rows):
+        tx.run(cypher, rows=rows).consume()
+    
+    def write_chunk(self, session, cypher, rows):
+        """
+        Send one chunk through an UNWIND statement in a single write transaction.
+
+        Returns the number of retries caused by deadlocks or other transient errors.
+        """
+        for attempt in range(MAX_WRITE_RETRIES + 1):
+            try:
+                session.execute_write(self._run_batch, cypher, rows)
+                return attempt
+            except TransientError:
+                if attempt == MAX_WRITE_RETRIES:
+                    raise
+                time.sleep(RETRY_BACKOFF_SECONDS * 2 ** attempt * (1 + random.random()))
+    
+    def write_batches(self, session, cypher, batches):
+        """Write each batch of rows as it arrives. Returns (rows written, retries)."""
+        rows = retries = 0
+        for batch in batches:
+            retries += self.write_chunk(session, cypher, batch)
+            rows += len(batch)
+        return rows, retries
+    
+    def partitions(self, query, key, params):
+        """Key ranges splitting a phase across the workers ([None] means the whole phase)."""
+        if self.workers == 1:
+            return [None]
+        with get_db_cursor() as cursor:
+            cursor.execute(f"SELECT MIN(phase_rows.{key}) AS lo, MAX(phase_rows.{key}) AS hi FROM ({query}) phase_rows", params)
+            bounds = cursor.fetchone()
+        if bounds["lo"] is None:
+            return [None]
+        return split_range(bounds["lo"], bounds["hi"], self.workers)
+    
+    def load_partition(self, query, key, cypher, transform, params, bounds):
+        """Read one partition of a phase from Postgres and write it in its own session."""
+        if bounds is not None:
+            query = partition_query(query, key)
+            params = {**params, "lo": bounds[0], "hi": bounds[1]}
+        # Each fetched batch is transformed and written before the next is read
+        batches = ([transform(row) for row in rows] for rows in stream_query(query, params, self.batch_size))
+        with self.session() as session:
+            return self.write_batches(session, cypher, batches)
+    
+    def run_stages(self, stages, params=None):
+        """
+        Load every phase, stage by stage, on a pool of `workers` threads.
+
+        Each phase is split by id range into up to `workers` partitions and
+        every partition gets its own driver session, so all phases of a stage
+        and all their partitions run concurrently. Returns per-phase stats.
+
+        A stage's partitions are all computed before any of its work starts:
+        running partitions hold pooled connections, and with `workers` equal
+        to the pool size a lookup in between would wait for one of them.
+        """
+        params = params or {}
+        stats = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for stage in stages:
+                planned = [(phase, self.partitions(phase[1], phase[2], params)) for phase in stage]
+                futures = {}
+                pending = {}
+                for (name, query, key, cypher, transform), partitions in planned:
+                    stats[name] = {"rows": 0, "retries": 0, "partitions": 0, "started": time.perf_counter()}
+                    for bounds in partitions:
+                        future = executor.submit(self.load_partition, query, key, cypher, transform, params, bounds)
+                        futures[future] = name
+                        stats[name]["partitions"] += 1
+                    pending[name] = stats[name]["partitions"]
+                
+                for future in as_completed(futures):
+                    name = futures[future]
+                    rows, retries = future.result()
+                    phase = stats[name]
+                    phase["rows"] += rows
+                    phase["retries"] += retries
+                    pending[name] -= 1
+                    if pending[name] == 0:
+                        elapsed = time.perf_counter() - phase.pop("started")
+                        rate = phase["rows"] / elapsed if elapsed > 0 else 0
+                        phase["seconds"] = round(elapsed, 3)
+                        phase["rows_per_second"] = round(rate, 1)
+                        retried = f", {phase['retries']} retries" if phase["retries"] else ""
+                        print(f"  ✓ {phase['rows']} {name} in {elapsed:.2f}s ({rate:.0f} rows/s, {phase['partitions']} partitions{retried})")
+        return stats
+    
+    def apply_tombstones(self, session, params):
+        """Remove nodes and relationships whose Postgres rows were deleted since the last sync."""
+        tombstones = stream_query(
+            "SELECT entity, entity_id, related_id FROM graph_tombstones"
+            + CHANGED_SINCE + " ORDER BY entity, row_version",
+            params, self.batch_size
+        )
+        
+        started = time.perf_counter()
+        by_entity = {}
+        retries = 0
+        for batch in tombstones:
+            for entity, group in groupby(batch, key=itemgetter("entity")):
+                rows = [{"entity_id": t["entity_id"], "related_id": t["related_id"]} for t in group]
+                retries += self.write_chunk(session, TOMBSTONE_CYPHER[entity], rows)
+                by_entity[entity] = by_entity.get(entity, 0) + len(rows)
+        elapsed = time.perf_counter() - started
+        
+        total = sum(by_entity.values())
+        rate = total / elapsed if elapsed > 0 else 0
+        details = ", ".join(f"{count} {entity}" for entity, count in by_entity.items())
+        print(f"  ✓ {total} deletions in {elapsed:.2f}s ({rate:.0f} rows/s{': ' + details if details else ''})")
+        return {"deletions": {
+            "rows": total, "seconds": round(elapsed, 3), "rows_per_second": round(rate, 1),
+            "retries": retries, "by_entity": by_entity,
+        }}
+    
+    def ingest(self, clear_first=True):
+        """Main ingestion function. Returns per-phase row counts and timings."""
+        with graph_sync_lock():
+            # Taken before reading so that anything written during the load is synced next time
+            until, snapshot = sync_point()
+            if clear_first:
+                self.clear_database()
+            self.ensure_schema()
             
-            # Load genres
-            with get_db_cursor() as cursor:
-                cursor.execute("SELECT id, name FROM genres")
-                genres = cursor.fetchall()
+            print(f"Starting Neo4j ingestion (batch size {self.batch_size}, {self.workers} workers)...")
+            stats = self.run_stages(INGEST_STAGES)
             
-            print(f"Creating {len(genres)} genre nodes...")
-            for genre in genres:
-                self.create_genre_node(session, genre['id'], genre['name'])
+            set_watermark(until, snapshot)
+            print(f"Neo4j ingestion completed successfully! (synced up to row version {until})")
+            return stats
+    
+    def ingest_incremental(self, oldest_change=None):
+        """
+        Apply only what changed in Postgres since the last sync.
+
+        Deletions are replayed first, then changed rows are upserted, so a row
+        deleted and re-created in the same window ends up present. The
+        watermark only moves once every phase has succeeded; a failed run is
+        simply repeated from the old watermark next time. `oldest_change`
+        (epoch seconds of the earliest change this sync is known to cover) is
+        used to record how far the graph trailed Postgres. The schema is not
+        touched here; call ensure_schema() once before the first sync.
+        """
+        with graph_sync_lock():
+            since, previous_snapshot = get_watermark()
+            until, snapshot = sync_point()
+            if until <= since and not changes_pending(previous_snapshot):
+                print(f"Neo4j graph is up to date (row version {since})")
+                return {}
+            if since == 0:
+                print("No previous sync recorded; loading every row")
             
-            # Create relationships: ACTED_IN
-            with get_db_cursor() as cursor:
-                cursor.execute("SELECT movie_id, actor_id FROM movie_actors")
-                movie_actors = cursor.fetchall()
+            print(f"Syncing changes after row version {since} up to {until} (batch size {self.batch_size}, {self.workers} workers)...")
             
-            print(f"Creating {len(movie_actors)} ACTED_IN relationships...")
-            for ma in movie_actors:
-                self.create_relationship(session, "ACTED_IN", "Actor", ma['actor_id'], "Movie", ma['movie_id'])
+            params = {"since": since, "until": until, "snapshot": previous_snapshot}
+            with self.session() as session:
+                stats = self.apply_tombstones(session, params)
+            stats.update(self.run_stages(INCREMENTAL_STAGES, params))
             
-            # Create relationships: DIRECTED
-            with get_db_cursor() as cursor:
-                cursor.execute("SELECT id, director_id FROM movies WHERE director_id IS NOT NULL")
-                movie_directors = cursor.fetchall()
+            lag = round(time.time() - oldest_change, 3) if oldest_change is not None else None
+            set_watermark(until, snapshot, lag_seconds=lag)
+            print("Neo4j incremental sync completed successfully!")
+            return stats
+    
+    def validate_counts(self):
+        """Compare node and relationship counts with Postgres. Returns the mismatches."""
+        mismatches = []
+        with self.session() as session:
+            for what, sql, cypher in GRAPH_COUNTS:
+                with get_db_cursor() as cursor:
+                    cursor.execute(sql)
+                    expected = cursor.fetchone()["count"]
+                actual = session.run(cypher).single()["count"]
+                if actual == expected:
+                    print(f"  ✓ {what}: {actual}")
+                else:
+                    print(f"  ✗ {what}: {actual} in Neo4j, {expected} in Postgres")
+                    mismatches.append((what, actual, expected))
+        return mismatches
+    
+    def _alias_target(self, system):
+        """Database the alias currently points at, or None if the alias doesn't exist yet."""
+        record = system.run(
+            "SHOW ALIASES FOR DATABASE YIELD name, database WHERE name = $alias RETURN database",
+            alias=self.database
+        ).single()
+        if record:
+            return record["database"]
+        if system.run("SHOW DATABASES YIELD name WHERE name = $name RETURN name", name=self.database).single():
+            raise ValueError(
+                f"NEO4J_DATABASE={self.database} is a database, not an alias; "
+                "set it to an alias name (e.g. movies) to use blue/green rebuilds"
+            )
+        return None
+    
+    def ingest_blue_green(self):
+        """
+        Rebuild the graph in a shadow database and switch to it atomically.
+
+        `database` is treated as an alias (Neo4j Enterprise) alternating
+        between `<alias>-blue` and `<alias>-green`. The idle one is recreated
+        empty, loaded, and checked against Postgres counts. Only then is the
+        alias repointed, in one system command, and the previous database
+        dropped. Readers using the alias never see a partial graph; if
+        validation fails the alias is left alone and the shadow kept for
+        inspection.
+        """
+        with graph_sync_lock():
+            alias = self.database
+            with self.driver.session(database="system") as system:
+                current = self._alias_target(system)
+                shadow = f"{alias}-{GENERATIONS[1]}" if current == f"{alias}-{GENERATIONS[0]}" else f"{alias}-{GENERATIONS[0]}"
+                print(f"Building {shadow} while {alias} serves {current or 'nothing'}...")
+                system.run("DROP DATABASE $name IF EXISTS WAIT", name=shadow).consume()
+                system.run("CREATE DATABASE $name WAIT", name=shadow).consume()
             
-            print(f"Creating {len(movie_directors)} DIRECTED relationships...")
-            for md in movie_directors:
-                self.create_relationship(session, "DIRECTED", "Director", md['director_id'], "Movie", md['id'])
+            until, snapshot = sync_point()
+            self.database = shadow
+            try:
+                self.ensure_schema()
+                print(f"Starting Neo4j ingestion into {shadow} (batch size {self.batch_size}, {self.workers} workers)...")
+                stats = self.run_stages(INGEST_STAGES)
+                print(f"Validating {shadow} against Postgres...")
+                mismatches = self.validate_counts()
+            finally:
+                self.database = alias
+            if mismatches:
+                raise RuntimeError(f"{shadow} does not match Postgres; {alias} still points at {current or 'nothing'}")
             
-            # Create relationships: HAS_GENRE
-            with get_db_cursor() as cursor:
-                cursor.execute("SELECT movie_id, genre_id FROM movie_genres")
-                movie_genres = cursor.fetchall()
+            with self.driver.session(database="system") as system:
+                if current is None:
+                    system.run("CREATE ALIAS $alias FOR DATABASE $target", alias=alias, target=shadow).consume()
+                else:
+                    system.run("ALTER ALIAS $alias SET DATABASE TARGET $target", alias=alias, target=shadow).consume()
+                print(f"Switched {alias} to {shadow}")
+                set_watermark(until, snapshot)
+                
+                # Only drop databases this mode created; an alias pointed elsewhere by hand is left alone
+                if current in (f"{alias}-{generation}" for generation in GENERATIONS):
+                    system.run("DROP DATABASE $name IF EXISTS", name=current).consume()
+                    print(f"Dropped previous generation {current}")
             
-            print(f"Creating {len(movie_genres)} HAS_GENRE relationships...")
-            for mg in movie_genres:
-                self.create_relationship(session, "HAS_GENRE", "Movie", mg['movie_id'], "Genre", mg['genre_id'])
-        
-        print("Neo4j ingestion completed successfully!")
+            print(f"Neo4j blue/green rebuild completed successfully! (synced up to row version {until})")
+            return stats
 
 
 def main():
-    ingester = Neo4jIngester()
+    parser = argparse.ArgumentParser(description="Load movies, people and genres from Postgres into Neo4j")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"Rows per UNWIND write transaction (default: {DEFAULT_BATCH_SIZE})"
+    )
+    parser.add_argument(
+        "--workers",
+        type=workers_arg,
+        default=DEFAULT_WORKERS,
+        help="Concurrent writers, at most POSTGRES_POOL_MAX_SIZE; each phase is split by id range across them (default: 1)"
+    )
+    parser.add_argument(
+        "--delete-batch-size",
+        type=int,
+        default=DEFAULT_DELETE_BATCH_SIZE,
+        help=f"Nodes or relationships deleted per transaction when wiping the graph (default: {DEFAULT_DELETE_BATCH_SIZE})"
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only apply rows changed since the last sync instead of wiping and reloading the graph"
+    )
+    mode.add_argument(
+        "--blue-green",
+        action="store_true",
+        help="Rebuild into a shadow database and switch the NEO4J_DATABASE alias to it (Neo4j Enterprise)"
+    )
+    mode.add_argument(
+        "--export-import-files",
+        metavar="DIR",
+        help="Write CSVs and a manifest for neo4j-admin database import to DIR instead of loading Neo4j"
+    )
+    mode.add_argument(
+        "--set-watermark",
+        type=int,
+        metavar="VERSION",
+        help="Record the graph as synced up to VERSION (e.g. the row_version of an imported export)"
+    )
+    parser.add_argument(
+        "--watermark-snapshot",
+        metavar="SNAPSHOT",
+        help="With --set-watermark, the Postgres snapshot the export was read from (from manifest.json)"
+    )
+    mode.add_argument(
+        "--wipe-only",
+        action="store_true",
+        help="Delete graph data and exit without loading anything"
+    )
+    parser.add_argument(
+        "--labels",
+        nargs="+",
+        help="With --wipe-only, delete only nodes with these labels (e.g. --labels Movie Genre)"
+    )
+    parser.add_argument(
+        "--gzip",
+        action="store_true",
+        help="With --export-import-files, gzip-compress the data files"
+    )
+    args = parser.parse_args()
+    if args.labels and not args.wipe_only:
+        parser.error("--labels can only be used with --wipe-only")
+    if args.gzip and not args.export_import_files:
+        parser.error("--gzip can only be used with --export-import-files")
+    if args.watermark_snapshot and args.set_watermark is None:
+        parser.error("--watermark-snapshot can only be used with --set-watermark")
+    
+    # These only touch Postgres and the filesystem
+    if args.export_import_files:
+        export_bulk_import(args.export_import_files, compress=args.gzip)
+        return
+    if args.set_watermark is not None:
+        with graph_sync_lock():
+            set_watermark(args.set_watermark, args.watermark_snapshot)
+        print(f"Neo4j graph marked as synced up to row version {args.set_watermark}")
+        return
+    
+    ingester = Neo4jIngester(batch_size=args.batch_size, workers=args.workers, delete_batch_size=args.delete_batch_size)
     try:
-        ingester.ingest(clear_first=True)
+        if args.wipe_only:
+            with graph_sync_lock():
+                ingester.clear_database(labels=args.labels)
+        elif args.incremental:
+            ingester.ensure_schema()
+            ingester.ingest_incremental()
+        elif args.blue_green:
+            ingester.ingest_blue_green()
+        else:
+            ingester.ingest(clear_first=True)
     finally:
         ingester.close()
+    bump_dataset_version()
 
 
 if __name__ == "__main__":
     main()
-
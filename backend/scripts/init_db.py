@@ -8,6 +8,8 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from app.config import settings
 import psycopg2
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from scripts.migrate import migrate
+from scripts.setup_db import bump_dataset_version
 
 
 def init_database():
@@ -31,6 +33,11 @@ def init_database():
         cursor.execute("DROP TABLE IF EXISTS actors CASCADE;")
         cursor.execute("DROP TABLE IF EXISTS directors CASCADE;")
         cursor.execute("DROP TABLE IF EXISTS genres CASCADE;")
+        cursor.execute("DROP TABLE IF EXISTS graph_tombstones CASCADE;")
+        cursor.execute("DROP TABLE IF EXISTS graph_sync_watermark CASCADE;")
+        cursor.execute("DROP TABLE IF EXISTS enrichment_runs CASCADE;")
+        cursor.execute("DROP SEQUENCE IF EXISTS row_version_seq CASCADE;")
+        cursor.execute("DROP TABLE IF EXISTS schema_migrations CASCADE;")
         
         # Create tables
         print("Creating tables...")
@@ -571,6 +578,13 @@ def init_database():
                         (movie_id, genre_map[genre_name])
                     )
         
+        # Add the indexes, views and bookkeeping tables on top of the seeded tables
+        try:
+            migrate()
+        finally:
+            # The catalog was replaced; drop what running APIs have cached
+            bump_dataset_version()
+        
         print("Database initialized successfully!")
         
     except Exception as e:
@@ -0,0 +1,516 @@
+"""
+Schema migrations: applies versioned schema changes in place, without dropping data.
+
+Each migration runs in its own transaction and is recorded in the
+schema_migrations table, so running this script again only applies what is
+new. A transaction-scoped advisory lock keeps concurrent runs from applying
+the same migration twice. A migration whose prerequisites the server lacks
+(e.g. a missing extension) raises MigrationError: it stays pending, the
+migrations after it still apply, and the run fails at the end.
+
+Usage:
+    python scripts/migrate.py            # apply pending migrations
+    python scripts/migrate.py --status   # list applied and pending migrations
+"""
+import sys
+import argparse
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.database import get_db_cursor
+
+# Arbitrary key for pg_advisory_xact_lock, shared by every migration run
+MIGRATION_LOCK_ID = 748_211_001
+
+
+class MigrationError(Exception):
+    """A migration cannot run on this server; it is left pending."""
+
+
+# Read model behind GET /api/movies: one row per movie with genres and actors
+# already aggregated, so the list endpoint is a single indexed scan.
+MOVIE_SUMMARY_SQL = """
+    CREATE MATERIALIZED VIEW IF NOT EXISTS movie_summary AS
+    SELECT
+        m.id, m.title, m.release_year, m.rating, m.description,
+        m.duration_minutes, m.budget, m.revenue, m.language, m.country,
+        m.enrichment_score, m.popularity_tier,
+        d.name AS director_name,
+        mg.genres,
+        COALESCE(mg.genre_names, '{}') AS genre_names,
+        ma.actors,
+        COALESCE(m.release_year, 0) AS sort_year
+    FROM movies m
+    LEFT JOIN directors d ON d.id = m.director_id
+    LEFT JOIN (
+        SELECT mg.movie_id,
+               STRING_AGG(g.name, ', ' ORDER BY g.name) AS genres,
+               ARRAY_AGG(g.name ORDER BY g.name)::text[] AS genre_names
+        FROM movie_genres mg
+        JOIN genres g ON g.id = mg.genre_id
+        GROUP BY mg.movie_id
+    ) mg ON mg.movie_id = m.id
+    LEFT JOIN (
+        SELECT ma.movie_id,
+               STRING_AGG(a.name, ', ' ORDER BY a.name) AS actors
+        FROM movie_actors ma
+        JOIN actors a ON a.id = ma.actor_id
+        GROUP BY ma.movie_id
+    ) ma ON ma.movie_id = m.id;
+"""
+
+
+def create_movie_summary(cursor):
+    """Create the movie_summary projection and its indexes if they don't exist."""
+    cursor.execute(MOVIE_SUMMARY_SQL)
+    # Unique index is required for REFRESH ... CONCURRENTLY
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS movie_summary_id_idx ON movie_summary (id);")
+    cursor.execute("CREATE INDEX IF NOT EXISTS movie_summary_sort_idx ON movie_summary (sort_year DESC, id DESC);")
+    cursor.execute("CREATE INDEX IF NOT EXISTS movie_summary_genre_names_idx ON movie_summary USING GIN (genre_names);")
+
+
+def create_dataset_version(cursor):
+    """Create the single-row dataset_version counter if it doesn't exist."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS dataset_version (
+            id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+            version BIGINT NOT NULL DEFAULT 0,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+    """)
+
+
+def baseline(cursor):
+    """Tables as created by setup_db.py, plus the movie_summary view and dataset version."""
+    # Directors table (simplified - only name)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS directors (
+            id SERIAL PRIMARY KEY,
+            name VARCHAR(255) NOT NULL UNIQUE
+        );
+    """)
+
+    # Actors table (simplified - only name)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS actors (
+            id SERIAL PRIMARY KEY,
+            name VARCHAR(255) NOT NULL UNIQUE
+        );
+    """)
+
+    # Genres table
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS genres (
+            id SERIAL PRIMARY KEY,
+            name VARCHAR(100) UNIQUE NOT NULL
+        );
+    """)
+
+    # Movies table
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS movies (
+            id SERIAL PRIMARY KEY,
+            title VARCHAR(255) NOT NULL,
+            release_year INTEGER,
+            rating DECIMAL(3, 1),
+            description TEXT,
+            director_id INTEGER REFERENCES directors(id),
+            duration_minutes INTEGER,
+            budget NUMERIC(15, 2),
+            revenue NUMERIC(15, 2),
+            language VARCHAR(50),
+            country VARCHAR(100),
+            enrichment_score DECIMAL(5, 2),
+            popularity_tier VARCHAR(50)
+        );
+    """)
+
+    # Junction tables
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS movie_actors (
+            movie_id INTEGER REFERENCES movies(id) ON DELETE CASCADE,
+            actor_id INTEGER REFERENCES actors(id) ON DELETE CASCADE,
+            PRIMARY KEY (movie_id, actor_id)
+        );
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS movie_genres (
+            movie_id INTEGER REFERENCES movies(id) ON DELETE CASCADE,
+            genre_id INTEGER REFERENCES genres(id) ON DELETE CASCADE,
+            PRIMARY KEY (movie_id, genre_id)
+        );
+    """)
+
+    create_movie_summary(cursor)
+    create_dataset_version(cursor)
+
+
+def router_indexes(cursor):
+    """Secondary indexes for the queries in app/repositories."""
+    # Director detail (movies by director, newest first) and director movie counts
+    cursor.execute("CREATE INDEX IF NOT EXISTS movies_director_year_idx ON movies (director_id, release_year DESC);")
+    # Year filters and the release_year DESC sort on the base table
+    cursor.execute("CREATE INDEX IF NOT EXISTS movies_release_year_idx ON movies (release_year DESC, id DESC);")
+    # Actor detail and actor movie counts; the primary key only covers movie_id lookups
+    cursor.execute("CREATE INDEX IF NOT EXISTS movie_actors_actor_idx ON movie_actors (actor_id, movie_id);")
+    cursor.execute("CREATE INDEX IF NOT EXISTS movie_genres_genre_idx ON movie_genres (genre_id, movie_id);")
+    # Keyset pagination on (name, id); also covers lookups by name where names aren't unique
+    cursor.execute("CREATE INDEX IF NOT EXISTS actors_name_id_idx ON actors (name, id);")
+    cursor.execute("CREATE INDEX IF NOT EXISTS directors_name_id_idx ON directors (name, id);")
+    cursor.execute("CREATE INDEX IF NOT EXISTS genres_name_idx ON genres (name);")
+
+
+def search(cursor):
+    """Full-text search over movies and trigram name search over actors and directors."""
+    cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    if not cursor.fetchone():
+        raise MigrationError(
+            "the pg_trgm extension is not available on this Postgres server. "
+            "Install the contrib package (e.g. postgresql-contrib) and run migrate.py again; "
+            "GET /api/search answers 503 until then."
+        )
+    cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+    # Title matches outrank description matches (weight A vs B)
+    cursor.execute("""
+        ALTER TABLE movies ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(description, '')), 'B')
+        ) STORED;
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS movies_search_vector_idx ON movies USING GIN (search_vector);")
+    cursor.execute("CREATE INDEX IF NOT EXISTS actors_name_trgm_idx ON actors USING GIN (name gin_trgm_ops);")
+    cursor.execute("CREATE INDEX IF NOT EXISTS directors_name_trgm_idx ON directors USING GIN (name gin_trgm_ops);")
+
+
+# Tables whose rows become graph nodes or relationships in Neo4j
+CHANGE_TRACKED_TABLES = ["movies", "actors", "directors", "genres", "movie_actors", "movie_genres"]
+
+
+def change_tracking(cursor):
+    """
+    Row versions and delete tombstones for incremental Neo4j syncs.
+
+    Every insert or update stamps the row with the next value of one shared
+    sequence, and every delete leaves a tombstone stamped from the same
+    sequence, so "everything that changed since version N" is a range query.
+    """
+    cursor.execute("CREATE SEQUENCE IF NOT EXISTS row_version_seq;")
+    cursor.execute("""
+        CREATE OR REPLACE FUNCTION bump_row_version() RETURNS trigger AS $$
+        BEGIN
+            NEW.row_version := nextval('row_version_seq');
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    for table in CHANGE_TRACKED_TABLES:
+        cursor.execute(f"""
+            ALTER TABLE {table}
+            ADD COLUMN IF NOT EXISTS row_version BIGINT NOT NULL DEFAULT nextval('row_version_seq');
+        """)
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {table}_row_version_idx ON {table} (row_version);")
+        cursor.execute(f"DROP TRIGGER IF EXISTS {table}_row_version ON {table};")
+        cursor.execute(f"""
+            CREATE TRIGGER {table}_row_version BEFORE UPDATE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION bump_row_version();
+        """)
+
+    # entity_id is the row id, or movie_id for junction rows (related_id is the other side)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS graph_tombstones (
+            row_version BIGINT PRIMARY KEY DEFAULT nextval('row_version_seq'),
+            entity VARCHAR(50) NOT NULL,
+            entity_id INTEGER NOT NULL,
+            related_id INTEGER,
+            deleted_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+    """)
+    # Trigger arguments: entity name, then the column(s) identifying the row
+    cursor.execute("""
+        CREATE OR REPLACE FUNCTION record_graph_tombstone() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO graph_tombstones (entity, entity_id, related_id)
+            VALUES (
+                TG_ARGV[0],
+                (to_jsonb(OLD) ->> TG_ARGV[1])::integer,
+                (to_jsonb(OLD) ->> TG_ARGV[2])::integer
+            );
+            RETURN OLD;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    for table, entity, columns, events in [
+        ("movies", "movie", "'id'", "DELETE"),
+        ("actors", "actor", "'id'", "DELETE"),
+        ("directors", "director", "'id'", "DELETE"),
+        ("genres", "genre", "'id'", "DELETE"),
+        # Changing either key of a junction row removes the old relationship
+        ("movie_actors", "movie_actor", "'movie_id', 'actor_id'", "DELETE OR UPDATE OF movie_id, actor_id"),
+        ("movie_genres", "movie_genre", "'movie_id', 'genre_id'", "DELETE OR UPDATE OF movie_id, genre_id"),
+    ]:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {table}_tombstone ON {table};")
+        cursor.execute(f"""
+            CREATE TRIGGER {table}_tombstone AFTER {events} ON {table}
+            FOR EACH ROW EXECUTE FUNCTION record_graph_tombstone('{entity}', {columns});
+        """)
+
+    # Highest row version already applied to Neo4j
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS graph_sync_watermark (
+            id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+            row_version BIGINT NOT NULL DEFAULT 0,
+            synced_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+    """)
+
+
+# Channel the graph sync worker LISTENs on
+GRAPH_CHANGES_CHANNEL = "graph_changes"
+
+
+def graph_change_feed(cursor):
+    """
+    NOTIFY on every write to a change-tracked table, for scripts/graph_sync_worker.py.
+
+    Triggers are per statement and the payload only names the table and the
+    transaction start time, so Postgres folds repeats within a transaction
+    into one notification: a bulk update of a million movies wakes the worker
+    once. The worker reads the actual changes through row_version.
+    """
+    cursor.execute(f"""
+        CREATE OR REPLACE FUNCTION notify_graph_change() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('{GRAPH_CHANGES_CHANNEL}', json_build_object(
+                'table', TG_TABLE_NAME,
+                'at', extract(epoch FROM now())
+            )::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    for table in CHANGE_TRACKED_TABLES:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {table}_notify_graph_change ON {table};")
+        cursor.execute(f"""
+            CREATE TRIGGER {table}_notify_graph_change AFTER INSERT OR UPDATE OR DELETE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION notify_graph_change();
+        """)
+    # Seconds between the oldest change a sync applied and the end of that sync
+    cursor.execute("ALTER TABLE graph_sync_watermark ADD COLUMN IF NOT EXISTS lag_seconds DOUBLE PRECISION;")
+
+
+def enrichment_tracking(cursor):
+    """
+    Dirty flags and run history for incremental enrichment (enrich_data.py --incremental).
+
+    A movie is dirty when it is new, when its rating or release year changes,
+    or when its cast changes (the actor count feeds the score). Existing
+    rows start dirty, so the first incremental run scores everything once.
+    """
+    cursor.execute("ALTER TABLE movies ADD COLUMN IF NOT EXISTS enrichment_dirty BOOLEAN NOT NULL DEFAULT TRUE;")
+    cursor.execute("CREATE INDEX IF NOT EXISTS movies_enrichment_dirty_idx ON movies (id) WHERE enrichment_dirty;")
+
+    cursor.execute("""
+        CREATE OR REPLACE FUNCTION mark_enrichment_dirty() RETURNS trigger AS $$
+        BEGIN
+            NEW.enrichment_dirty := TRUE;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    cursor.execute("DROP TRIGGER IF EXISTS movies_enrichment_dirty ON movies;")
+    cursor.execute("""
+        CREATE TRIGGER movies_enrichment_dirty BEFORE UPDATE OF rating, release_year ON movies
+        FOR EACH ROW
+        WHEN (OLD.rating IS DISTINCT FROM NEW.rating OR OLD.release_year IS DISTINCT FROM NEW.release_year)
+        EXECUTE FUNCTION mark_enrichment_dirty();
+    """)
+
+    # Cast changes arrive in bulk from the loaders, so mark their movies once
+    # per statement from the transition table rather than once per row
+    cursor.execute("""
+        CREATE OR REPLACE FUNCTION mark_cast_changed() RETURNS trigger AS $$
+        BEGIN
+            UPDATE movies SET enrichment_dirty = TRUE
+            WHERE id IN (SELECT movie_id FROM changed_rows);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    for event, transition in [("INSERT", "NEW"), ("DELETE", "OLD"), ("UPDATE", "NEW")]:
+        trigger = f"movie_actors_enrichment_{event.lower()}"
+        cursor.execute(f"DROP TRIGGER IF EXISTS {trigger} ON movie_actors;")
+        cursor.execute(f"""
+            CREATE TRIGGER {trigger} AFTER {event} ON movie_actors
+            REFERENCING {transition} TABLE AS changed_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION mark_cast_changed();
+        """)
+    # Moving a cast row to another movie also changes the old movie's count
+    cursor.execute("DROP TRIGGER IF EXISTS movie_actors_enrichment_update_old ON movie_actors;")
+    cursor.execute("""
+        CREATE TRIGGER movie_actors_enrichment_update_old AFTER UPDATE ON movie_actors
+        REFERENCING OLD TABLE AS changed_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION mark_cast_changed();
+    """)
+
+    # One row per enrichment run; the latest finished run's scoring_year
+    # tells the next incremental run whether the recency term has rolled over
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS enrichment_runs (
+            id SERIAL PRIMARY KEY,
+            mode VARCHAR(20) NOT NULL,
+            scoring_year INTEGER NOT NULL,
+            started_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            finished_at TIMESTAMPTZ,
+            movies_scored INTEGER NOT NULL DEFAULT 0,
+            movies_updated INTEGER NOT NULL DEFAULT 0
+        );
+    """)
+
+
+def enrichment_components(cursor):
+    """
+    Per-component enrichment scores and the scorer version that produced them.
+
+    enrichment_components maps "name@version" to that component's score (see
+    scripts/enrichment_scorers.py). enrichment_scorer_version names every
+    component and weight behind enrichment_score.
+    """
+    cursor.execute("ALTER TABLE movies ADD COLUMN IF NOT EXISTS enrichment_components JSONB;")
+    cursor.execute("ALTER TABLE movies ADD COLUMN IF NOT EXISTS enrichment_scorer_version VARCHAR(255);")
+    cursor.execute("ALTER TABLE enrichment_runs ADD COLUMN IF NOT EXISTS scorer_version VARCHAR(255);")
+
+
+def sync_snapshots(cursor):
+    """
+    Writing transaction ids, so incremental syncs cannot skip late commits.
+
+    A row version is drawn when a row is written but only becomes visible
+    when its transaction commits, so a sync can pass version N while the
+    row holding it is still uncommitted. Each row now records the id of the
+    transaction that wrote it (row_xid), and each sync records the snapshot
+    it read from. The next sync re-reads rows written by transactions that
+    snapshot could not see, whatever their version.
+    """
+    cursor.execute("""
+        CREATE OR REPLACE FUNCTION bump_row_version() RETURNS trigger AS $$
+        BEGIN
+            NEW.row_version := nextval('row_version_seq');
+            NEW.row_xid := pg_current_xact_id();
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    for table in CHANGE_TRACKED_TABLES + ["graph_tombstones"]:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS row_xid xid8 NOT NULL DEFAULT pg_current_xact_id();")
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {table}_row_xid_idx ON {table} (row_xid);")
+    # Snapshot the last sync read from; NULL when unknown (e.g. after a wipe)
+    cursor.execute("ALTER TABLE graph_sync_watermark ADD COLUMN IF NOT EXISTS snapshot pg_snapshot;")
+
+
+def drop_duplicate_indexes(cursor):
+    """Drop indexes that duplicate one a constraint already provides."""
+    # router_indexes builds genres (name), which the UNIQUE constraint on
+    # genres.name already indexes
+    cursor.execute("DROP INDEX IF EXISTS genres_name_idx;")
+
+
+# (version, name, function applying the change to a cursor), in order.
+# Append new migrations; never edit or reorder ones that have shipped.
+MIGRATIONS = [
+    (1, "baseline", baseline),
+    (2, "router_indexes", router_indexes),
+    (3, "search", search),
+    (4, "change_tracking", change_tracking),
+    (5, "graph_change_feed", graph_change_feed),
+    (6, "enrichment_tracking", enrichment_tracking),
+    (7, "enrichment_components", enrichment_components),
+    (8, "sync_snapshots", sync_snapshots),
+    (9, "drop_duplicate_indexes", drop_duplicate_indexes),
+]
+
+
+def ensure_migrations_table():
+    with get_db_cursor() as cursor:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                name VARCHAR(255) NOT NULL,
+                applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+            );
+        """)
+
+
+def applied_versions():
+    """Return the set of migration versions already applied."""
+    ensure_migrations_table()
+    with get_db_cursor() as cursor:
+        cursor.execute("SELECT version FROM schema_migrations")
+        return {row["version"] for row in cursor.fetchall()}
+
+
+def migrate():
+    """
+    Apply all pending migrations. Returns the number applied.
+
+    Raises MigrationError after applying the rest if any migration could not
+    run on this server.
+    """
+    ensure_migrations_table()
+    applied = 0
+    failed = []
+
+    for version, name, apply in MIGRATIONS:
+        try:
+            with get_db_cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK_ID,))
+                cursor.execute("SELECT 1 FROM schema_migrations WHERE version = %s", (version,))
+                if cursor.fetchone():
+                    continue
+
+                print(f"Applying migration {version}: {name}...")
+                apply(cursor)
+                cursor.execute(
+                    "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                    (version, name)
+                )
+                applied += 1
+        except MigrationError as e:
+            print(f"❌ Migration {version} ({name}) left pending: {e}")
+            failed.append(f"{version} ({name})")
+
+    if applied:
+        print(f"✅ Applied {applied} migration(s)")
+    elif not failed:
+        print("Schema is up to date")
+    if failed:
+        raise MigrationError(f"Pending migration(s) could not be applied: {', '.join(failed)}")
+    return applied
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply database schema migrations")
+    parser.add_argument(
+        "--status",
+        action="store_true",
+        help="List applied and pending migrations without applying anything"
+    )
+    args = parser.parse_args()
+
+    if args.status:
+        done = applied_versions()
+        for version, name, _ in MIGRATIONS:
+            state = "applied" if version in done else "pending"
+            print(f"  {version:>4}  {name:<30} {state}")
+        return
+
+    try:
+        migrate()
+    except MigrationError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
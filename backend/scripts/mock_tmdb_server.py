@@ -0,0 +1,140 @@
+"""
+Mock TMDB server for exercising fetch_movies_from_tmdb.py without an API key.
+
+Serves /3/discover/movie and /3/movie/{id} with deterministic fake movies
+(every 7th one is missing its director, so incomplete movies are skipped as
+with the real API). The server can add latency and enforce its own rate
+limit, answering 429 with a Retry-After header, so concurrency and backoff
+can be tested end to end.
+
+Usage:
+    python scripts/mock_tmdb_server.py --port 8765 --latency-ms 50 --rate-limit 40
+    python scripts/fetch_movies_from_tmdb.py --count 500 --base-url http://localhost:8765/3
+"""
+import re
+import json
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+PAGE_SIZE = 20
+TOTAL_PAGES = 500
+GENRES = ["Action", "Comedy", "Drama", "Thriller", "Science Fiction", "Animation", "Romance", "Horror"]
+MOVIE_PATH = re.compile(r"^/3/movie/(\d+)$")
+
+
+def fake_movie(movie_id):
+    """Deterministic TMDB-shaped movie detail with credits."""
+    crew = [{"job": "Director", "name": f"Mock Director {movie_id % 400}"}] if movie_id % 7 else []
+    return {
+        "id": movie_id,
+        "title": f"Mock Movie {movie_id}",
+        "release_date": f"{1960 + movie_id % 65}-{1 + movie_id % 12:02d}-{1 + movie_id % 28:02d}",
+        "vote_average": round(5 + (movie_id * 37 % 50) / 10, 1),
+        "overview": f"Synthetic movie {movie_id} served by the mock TMDB server.",
+        "runtime": 80 + movie_id % 90,
+        "budget": 1_000_000 * (movie_id % 200),
+        "revenue": 3_000_000 * (movie_id % 150),
+        "original_language": "en",
+        "production_countries": [{"iso_3166_1": "US"}],
+        "genres": [{"id": i, "name": GENRES[(movie_id + i) % len(GENRES)]} for i in range(1 + movie_id % 3)],
+        "credits": {
+            "cast": [{"name": f"Mock Actor {(movie_id * 31 + k * 97) % 5000}"} for k in range(6)],
+            "crew": crew,
+        },
+    }
+
+
+class RateLimiter:
+    """Fixed one-second window, like TMDB's per-IP limit."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.window = int(time.time())
+        self.count = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Return 0 if the request may proceed, otherwise seconds until the next window."""
+        if not self.limit:
+            return 0
+        with self._lock:
+            now = time.time()
+            if int(now) != self.window:
+                self.window, self.count = int(now), 0
+            self.count += 1
+            if self.count <= self.limit:
+                return 0
+            self.rejected += 1
+            return max(1, round(self.window + 1 - now))
+
+
+class MockTMDBHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, as the real API
+
+    def send_json(self, status, body, headers=None):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        server = self.server
+        server.requests += 1
+        retry_after = server.limiter.allow()
+        if retry_after:
+            self.send_json(429, {"status_code": 25, "status_message": "Request count over limit"},
+                           {"Retry-After": str(retry_after)})
+            return
+        if server.latency:
+            time.sleep(server.latency)
+
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path == "/3/discover/movie":
+            page = int(query.get("page", ["1"])[0])
+            if page > TOTAL_PAGES:
+                self.send_json(422, {"errors": ["page must be less than or equal to 500"]})
+                return
+            first = (page - 1) * PAGE_SIZE + 1
+            results = [{"id": movie_id} for movie_id in range(first, first + PAGE_SIZE)]
+            self.send_json(200, {"page": page, "results": results, "total_pages": TOTAL_PAGES})
+        elif match := MOVIE_PATH.match(url.path):
+            self.send_json(200, fake_movie(int(match.group(1))))
+        else:
+            self.send_json(404, {"status_code": 34, "status_message": "The resource you requested could not be found."})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve fake TMDB responses for local testing")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on (default: 8765)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay added to every response (default: 0)")
+    parser.add_argument("--rate-limit", type=int, default=0, help="Requests per second before answering 429 (default: 0 = unlimited)")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("localhost", args.port), MockTMDBHandler)
+    server.daemon_threads = True
+    server.latency = args.latency_ms / 1000
+    server.limiter = RateLimiter(args.rate_limit)
+    server.requests = 0
+    print(f"Mock TMDB listening on http://localhost:{args.port}/3")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"Stopping ({server.requests} requests, {server.limiter.rejected} rejected with 429)")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,94 +1,89 @@
 """
 Database setup script - creates tables without seed data.
 Use fetch_movies_from_tmdb.py to populate data.
+
+Usage:
+    python scripts/setup_db.py          # create or upgrade the schema in place
+    python scripts/setup_db.py --reset  # drop all tables first (destroys data)
 """
 import sys
+import argparse
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
 from app.database import get_db_cursor
+from scripts.migrate import MigrationError, create_dataset_version, create_movie_summary, migrate
 
 
-def create_schema():
-    """Create database schema."""
-    print("Creating database schema...")
-    
+def refresh_movie_summary():
+    """Rebuild the movie_summary projection without blocking readers."""
+    with get_db_cursor() as cursor:
+        create_movie_summary(cursor)
+        cursor.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY movie_summary;")
+    print("Refreshed movie_summary projection")
+
+
+def bump_dataset_version():
+    """Mark the catalog as changed so API caches drop what they hold."""
+    with get_db_cursor() as cursor:
+        create_dataset_version(cursor)
+        cursor.execute("""
+            INSERT INTO dataset_version (id, version) VALUES (TRUE, 1)
+            ON CONFLICT (id) DO UPDATE
+            SET version = dataset_version.version + 1, updated_at = now()
+            RETURNING version
+        """)
+        version = cursor.fetchone()["version"]
+    print(f"Dataset version bumped to {version}")
+
+
+def drop_schema():
+    """
+    Drop every table and view (for clean setup).
+
+    dataset_version is kept: API clients still hold ETags built from it, so
+    the version must keep counting up across a reset rather than restart.
+    """
     with get_db_cursor() as cursor:
-        # Drop existing tables (for clean setup)
         print("Dropping existing tables...")
+        cursor.execute("DROP MATERIALIZED VIEW IF EXISTS movie_summary;")
         cursor.execute("DROP TABLE IF EXISTS movie_genres CASCADE;")
         cursor.execute("DROP TABLE IF EXISTS movie_actors CASCADE;")
         cursor.execute("DROP TABLE IF EXISTS movies CASCADE;")
         cursor.execute("DROP TABLE IF EXISTS actors CASCADE;")
         cursor.execute("DROP TABLE IF EXISTS directors CASCADE;")
         cursor.execute("DROP TABLE IF EXISTS genres CASCADE;")
-        
-        # Create tables
-        print("Creating tables...")
-        
-        # Directors table (simplified - only name)
-        cursor.execute("""
-            CREATE TABLE directors (
-                id SERIAL PRIMARY KEY,
-                name VARCHAR(255) NOT NULL UNIQUE
-            );
-        """)
-        
-        # Actors table (simplified - only name)
-        cursor.execute("""
-            CREATE TABLE actors (
-                id SERIAL PRIMARY KEY,
-                name VARCHAR(255) NOT NULL UNIQUE
-            );
-        """)
-        
-        # Genres table
-        cursor.execute("""
-            CREATE TABLE genres (
-                id SERIAL PRIMARY KEY,
-                name VARCHAR(100) UNIQUE NOT NULL
-            );
-        """)
-        
-        # Movies table
-        cursor.execute("""
-            CREATE TABLE movies (
-                id SERIAL PRIMARY KEY,
-                title VARCHAR(255) NOT NULL,
-                release_year INTEGER,
-                rating DECIMAL(3, 1),
-                description TEXT,
-                director_id INTEGER REFERENCES directors(id),
-                duration_minutes INTEGER,
-                budget NUMERIC(15, 2),
-                revenue NUMERIC(15, 2),
-                language VARCHAR(50),
-                country VARCHAR(100),
-                enrichment_score DECIMAL(5, 2),
-                popularity_tier VARCHAR(50)
-            );
-        """)
-        
-        # Junction tables
-        cursor.execute("""
-            CREATE TABLE movie_actors (
-                movie_id INTEGER REFERENCES movies(id) ON DELETE CASCADE,
-                actor_id INTEGER REFERENCES actors(id) ON DELETE CASCADE,
-                PRIMARY KEY (movie_id, actor_id)
-            );
-        """)
-        
-        cursor.execute("""
-            CREATE TABLE movie_genres (
-                movie_id INTEGER REFERENCES movies(id) ON DELETE CASCADE,
-                genre_id INTEGER REFERENCES genres(id) ON DELETE CASCADE,
-                PRIMARY KEY (movie_id, genre_id)
-            );
-        """)
-        
-        print("✅ Database schema created successfully!")
+        cursor.execute("DROP TABLE IF EXISTS graph_tombstones CASCADE;")
+        cursor.execute("DROP TABLE IF EXISTS graph_sync_watermark CASCADE;")
+        cursor.execute("DROP TABLE IF EXISTS enrichment_runs CASCADE;")
+        cursor.execute("DROP SEQUENCE IF EXISTS row_version_seq CASCADE;")
+        cursor.execute("DROP TABLE IF EXISTS schema_migrations CASCADE;")
 
 
-if __name__ == "__main__":
-    create_schema()
+def create_schema(reset=False):
+    """Create database schema, or bring an existing one up to date."""
+    print("Creating database schema...")
+    
+    if reset:
+        drop_schema()
+        # The catalog is gone; invalidate everything served from the old one
+        bump_dataset_version()
+    
+    migrate()
+    
+    print("✅ Database schema created successfully!")
+
 
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create or upgrade the database schema")
+    parser.add_argument(
+        "--reset",
+        action="store_true",
+        help="Drop all existing tables and data before creating the schema"
+    )
+    args = parser.parse_args()
+    try:
+        create_schema(reset=args.reset)
+    except MigrationError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
@@ -59,6 +59,13 @@ export const movieApi = {
     const response = await apiClient.get<MovieDetail>(`/api/movies/${id}`);
     return response.data;
   },
+
+  async getMovieDetails(ids: number[]): Promise<MovieDetail[]> {
+    const response = await apiClient.get<MovieDetail[]>('/api/movies/batch', {
+      params: { ids: ids.join(',') },
+    });
+    return response.data;
+  },
 };
 
 export const actorApi = {